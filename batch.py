@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from deadline import Deadline, running
+from field_specs import column_types
+from xlsx_stream import Sink, iter_xlsx, sheet
+
+BATCH_PROCESSES = int(os.environ.get("BATCH_PROCESSES", os.cpu_count() or 2))
+SHEET_NAMES = {"courier": "Courier", "boe": "BOE", "cargo": "Cargo"}
+
+_executor = None
+
+
+def new_executor(processes=BATCH_PROCESSES):
+    # Spawned (not forked) workers: the parent runs job-queue and driver-pool
+    # threads that must not be duplicated into the children.
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = new_executor()
+    return _executor
+
+
+def reset_executor():
+    # A crashed child (segfault, OOM kill) breaks the whole pool; drop it so
+    # the next batch starts a fresh one.
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def timed_call(func, *args):
+    # Each file gets its own CONVERSION_TIMEOUT, counted from when a worker
+    # picks it up.
+    start = time.perf_counter()
+    try:
+        with running(Deadline()):
+            return func(*args), None, time.perf_counter() - start
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start
+
+
+def run_batch(func, tasks):
+    # tasks: [{"file", "doc_type", "args", "error"}]; a task that already
+    # carries an error (bad extension, ...) is reported without running.
+    # func returns (doc_type, rows), the doc type as detected for "auto".
+    start = time.perf_counter()
+    executor = get_executor()
+    futures = [executor.submit(timed_call, func, *task["args"]) if not task.get("error") else None
+               for task in tasks]
+
+    results = []
+    for task, future in zip(tasks, futures):
+        value, error, seconds = None, task.get("error"), 0.0
+        if future is not None:
+            try:
+                value, error, seconds = future.result()
+            except BrokenProcessPool as e:
+                error = str(e)
+                reset_executor()
+            except Exception as e:
+                error = str(e)
+        doc_type, rows = value or (task["doc_type"], [])
+        results.append({
+            "file": task["file"],
+            "doc_type": doc_type,
+            "status": "failed" if error else "ok",
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "error": error or "",
+        })
+
+    return results, batch_summary(results, time.perf_counter() - start)
+
+
+def batch_summary(results, elapsed):
+    return {
+        "files": len(results),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "seconds": round(elapsed, 4),
+        "files_per_second": round(len(results) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def summary_rows(results):
+    return [{
+        "File": r["file"],
+        "Doc Type": r["doc_type"],
+        "Status": r["status"],
+        "Rows": len(r["rows"]),
+        "Seconds": r["seconds"],
+        "Error": r["error"],
+    } for r in results]
+
+
+def summary_headers(summary):
+    return {
+        "X-Batch-Files": str(summary["files"]),
+        "X-Batch-Failed": str(summary["failed"]),
+        "X-Batch-Seconds": str(summary["seconds"]),
+        "X-Batch-Files-Per-Second": str(summary["files_per_second"]),
+    }
+
+
+def iter_batch_workbook(results, summary):
+    sheets = []
+    for doc_type, sheet_name in SHEET_NAMES.items():
+        if any(r["doc_type"] == doc_type and r["rows"] for r in results):
+            rows = [{"Source File": r["file"], **row}
+                    for r in results if r["doc_type"] == doc_type for row in r["rows"]]
+            sheets.append(sheet(sheet_name, rows, types=column_types(doc_type)))
+    sheets.append(sheet("Summary", summary_rows(results)))
+    sheets.append(sheet("Throughput", [{
+        "Files": summary["files"],
+        "Failed": summary["failed"],
+        "Seconds": summary["seconds"],
+        "Files per Second": summary["files_per_second"],
+    }]))
+    return iter_xlsx(sheets)
+
+
+def iter_batch_zip(results, summary):
+    # Each per-file workbook is streamed into its zip entry, and the zip
+    # itself out through the same unseekable sink iter_xlsx uses.
+    sink = Sink()
+    used = set()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for r in results:
+            if r["status"] != "ok":
+                continue
+            base = os.path.splitext(r["file"])[0] or "converted"
+            name, n = f"{base}.xlsx", 1
+            while name in used:
+                n += 1
+                name = f"{base}_{n}.xlsx"
+            used.add(name)
+            with zf.open(name, "w") as entry:
+                for chunk in iter_xlsx([sheet("Sheet1", r["rows"], types=column_types(r["doc_type"]))]):
+                    entry.write(chunk)
+                    yield sink.drain()
+        zf.writestr("summary.json", json.dumps({"summary": summary, "files": summary_rows(results)}, indent=2))
+    yield sink.drain()
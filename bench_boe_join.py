@@ -0,0 +1,73 @@
+import time
+import argparse
+import pandas as pd
+
+from synthetic import boe_pages
+from page_index import PageIndex
+from field_specs import (
+    BOE_SECTIONS, BOE_ITEM_PATTERN, BOE_ITEM_COLUMNS, BOE_MANUFACTURER, DUTY_PATTERN, duty_rows,
+)
+from newapi import extract_boe_metadata, join_boe_rows
+
+# === Row-by-row join, as parse_boe_pages did it before join_boe_rows ===
+
+
+def legacy_join(metadata, records, manufacturers, matches):
+    df_items = pd.DataFrame(records, columns=[c.column for c in BOE_ITEM_COLUMNS])
+    for col in df_items.columns:
+        df_items[col] = df_items[col].str.strip()
+    manufacturer_column = [m.strip() for m in manufacturers[:len(df_items)]]
+    df_items["Name of Manufacturer"] = manufacturer_column + [""] * (len(df_items) - len(manufacturer_column))
+    df_duties = pd.DataFrame(duty_rows(matches))
+
+    final_data = []
+    for i in range(min(len(df_items), len(df_duties))):
+        final_data.append({
+            **metadata,
+            **df_items.iloc[i].to_dict(),
+            **df_duties.iloc[i].to_dict(),
+            "BE Type": "",
+            "CB Name": "",
+            "Total freight": "",
+            "Total insurance": "",
+            "Incoterms": "",
+            "penalty_amount": "",
+            "fine_amount": ""
+        })
+    return final_data
+
+
+def best_of(func, args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the row-by-row and columnar BOE items/duties join.")
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'items':>6} {'row-by-row ms':>14} {'columnar ms':>12} {'speedup':>8}")
+    for items in args.items:
+        index = PageIndex([p["content"] for p in boe_pages(items=items, items_per_page=5)], BOE_SECTIONS)
+        text = index.full_text
+        inputs = (
+            extract_boe_metadata(index),
+            BOE_ITEM_PATTERN.findall(text),
+            BOE_MANUFACTURER.findall(text),
+            [m for page in index.texts for m in DUTY_PATTERN.findall(page)],
+        )
+        legacy_s, legacy = best_of(legacy_join, inputs, args.repeat)
+        columnar_s, columnar = best_of(join_boe_rows, inputs, args.repeat)
+        if pd.DataFrame(legacy).to_dict("split") != pd.DataFrame(columnar).to_dict("split"):
+            raise SystemExit(f"❌ sheets differ at {items} items")
+        print(f"{items:>6} {legacy_s * 1000:>14.2f} {columnar_s * 1000:>12.2f} {legacy_s / columnar_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
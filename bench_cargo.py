@@ -0,0 +1,42 @@
+import time
+import argparse
+
+from synthetic import cargo_pages
+from newapi import parse_cargo_pages
+
+
+def best_of(func, args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time parse_cargo_pages on synthetic cargo BOEs.")
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--items-per-page", type=int, default=20)
+    parser.add_argument("--invoices", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="parse-time budget for a 1,000-item document")
+    args = parser.parse_args()
+
+    print(f"{'items':>6} {'pages':>6} {'KB':>7} {'parse ms':>9} {'µs/item':>8}")
+    verdicts = []
+    for items in args.items:
+        pages = cargo_pages(items=items, items_per_page=args.items_per_page, invoices=args.invoices)
+        size = sum(len(p["content"]) for p in pages)
+        seconds, rows = best_of(parse_cargo_pages, (pages,), args.repeat)
+        assert len(rows) == items, f"parsed {len(rows)} of {items} items"
+        ms = seconds * 1000
+        print(f"{items:>6} {len(pages):>6} {size / 1024:>7.0f} {ms:>9.2f} {ms * 1000 / max(items, 1):>8.1f}")
+        if items == 1000:
+            verdicts.append(ms <= args.budget_ms)
+    if verdicts:
+        print(f"{'✅' if all(verdicts) else '❌'} 1,000 items against a {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import io
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+
+from synthetic import boe_pages
+from newapi import parse_boe_pages
+from field_specs import column_types
+from xlsx_stream import iter_xlsx, sheet
+
+
+def boe_rows(count, template):
+    # Rows are produced lazily, as a parser feeding the exporter would.
+    for i in range(count):
+        row = dict(template[i % len(template)])
+        row["Item Description"] = f"WIDGET MODEL {i:07d} STEEL"
+        yield row
+
+
+def measure(func, trace):
+    # Timed untraced; tracemalloc slows allocation-heavy code several times
+    # over, so the peak comes from a second, traced run.
+    start = time.perf_counter()
+    size = func()
+    seconds = time.perf_counter() - start
+    if not trace:
+        return seconds, None, size
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, size
+
+
+def mb(peak):
+    return f"{peak / 2**20:>8.1f}" if peak is not None else f"{'-':>8}"
+
+
+def stream(count, template):
+    types = column_types("boe")
+    return sum(len(chunk) for chunk in iter_xlsx([sheet("Sheet1", boe_rows(count, template), types=types)]))
+
+
+def to_excel(count, template):
+    buf = io.BytesIO()
+    pd.DataFrame(list(boe_rows(count, template))).to_excel(buf, index=False)
+    return buf.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pandas to_excel with the streaming XLSX exporter.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1000, 10000, 100000])
+    parser.add_argument("--pandas-max", type=int, default=10000,
+                        help="skip to_excel above this many rows (it is slow and memory bound)")
+    parser.add_argument("--trace-max", type=int, default=100000,
+                        help="skip the traced memory run above this many rows")
+    args = parser.parse_args()
+
+    template = parse_boe_pages(boe_pages(items=50, items_per_page=5))
+    print(f"{'rows':>8} {'to_excel s':>11} {'peak MB':>8} {'stream s':>9} {'peak MB':>8} {'rows/s':>10} {'size MB':>8}")
+    for count in args.rows:
+        trace = count <= args.trace_max
+        stream_s, stream_peak, size = measure(lambda: stream(count, template), trace)
+        if count <= args.pandas_max:
+            pandas_s, pandas_peak, _ = measure(lambda: to_excel(count, template), trace)
+            pandas_cols = f"{pandas_s:>11.2f} {mb(pandas_peak)}"
+        else:
+            pandas_cols = f"{'-':>11} {'-':>8}"
+        print(f"{count:>8} {pandas_cols} {stream_s:>9.2f} {mb(stream_peak)} "
+              f"{count / stream_s:>10.0f} {size / 2**20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import time
+import argparse
+import tempfile
+import pandas as pd
+
+from synthetic import boe_pages
+from newapi import parse_boe_pages
+from exporters import EXPORTERS, export_rows, format_error
+
+
+def to_excel(rows, path_base):
+    path = path_base + ".xlsx"
+    pd.DataFrame(rows).to_excel(path, index=False)
+    return path
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    path = func(*args)
+    return time.perf_counter() - start, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare write time and size of the output formats against to_excel.")
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    formats = [f for f in EXPORTERS if not format_error(f)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for items in args.items:
+            rows = parse_boe_pages(boe_pages(items=items, items_per_page=5))
+            print(f"\n=== {len(rows)} BOE rows ===")
+            print(f"{'format':<16} {'write s':>8} {'size KB':>9} {'vs to_excel':>12}")
+            base_s, base_size = timed(to_excel, rows, os.path.join(tmp, "pandas"))
+            print(f"{'to_excel':<16} {base_s:>8.3f} {base_size / 1024:>9.0f} {'1.0x':>12}")
+            for output_format in formats:
+                seconds, size = timed(export_rows, rows, "boe", output_format, os.path.join(tmp, output_format))
+                print(f"{output_format:<16} {seconds:>8.3f} {size / 1024:>9.0f} {base_s / seconds:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
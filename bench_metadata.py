@@ -0,0 +1,78 @@
+import re
+import time
+import argparse
+
+from synthetic import boe_pages
+from newapi import extract_boe_metadata
+from page_index import PageIndex
+from field_specs import BOE_SECTIONS
+
+# === Per-field regex approach, as process_boe_pdf did it before the label scanner ===
+
+
+def extract(pattern, text, default="Not found"):
+    match = re.search(pattern, text, re.DOTALL)
+    return match.group(1).strip() if match else default
+
+
+def legacy_boe_metadata(full_text):
+    challan_block = extract(r"Challan Date\s*(.*?)\s*DECLARATION", full_text)
+    challan_values = re.search(r"(\d+)\s+(\d+)\s+(\d+)\s+(\d{2}/\d{2}/\d{4})", challan_block)
+    return {
+        "CBEXIV Number": extract(r"CBEXIV Number\s*:\s*(.*?)\s", full_text),
+        "Importer Name": extract(r"Import Export Branch Code\s*:\s*.*?Name\s*:\s*(.*?)\s+Address", full_text),
+        "Importer Address": extract(r"Import Export Branch Code\s*:\s*.*?Address\s*:\s*(.*?)\s*Category Of Importer", full_text),
+        "Supplier Name": extract(r"SUPPLIER DETAILS\s.*?Name\s*:\s*(.*?)\s+Address", full_text),
+        "Supplier Address": extract(r"SUPPLIER DETAILS\s.*?Address\s*:\s*(.*?)\s*IF SUPPLIER IS NOT THE SELLER", full_text),
+        "BOE Date": extract(r"BOE Date\s*:\s*(.*?)\s", full_text),
+        "Country of Origin": extract(r"Country of Origin\s*:\s*(.*?)\s", full_text),
+        "Country of Consignment": extract(r"Country of Consignment\s*:\s*(.*?)\s", full_text),
+        "House Airway Bill (HAWB) Number": extract(r"House Airway Bill \(HAWB\) Number\s*:\s*(.*?)\s", full_text),
+        "Master Airway Bill (MAWB) Number": extract(r"Master Airway Bill \(MAWB\) Number\s*:\s*(.*?)\s", full_text),
+        "Interest Amount": extract(r"Interest Amount\s*:\s*(.*?)\s", full_text),
+        "Invoice Number": extract(r"Invoice Number\s*:\s*(.*?)\s", full_text),
+        "Date of Invoice": extract(r"Date of Invoice\s*:\s*(.*?)\s", full_text),
+        "Invoice Value": extract(r"Invoice Value\s*:\s*(.*?)\s", full_text),
+        "Currency": extract(r"Currency\s*:\s*(USD|INR|EUR|[A-Z]{3})", full_text),
+        "TR-6 Challan Number": challan_values.group(2) if challan_values else "Not found",
+        "Total Amount": challan_values.group(3) if challan_values else "Not found",
+        "Challan Date": challan_values.group(4) if challan_values else "Not found",
+    }
+
+
+def best_of(func, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-field regex and single-pass label scanning on BOE metadata.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50, 100, 200, 400])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scenarios = [
+        ("complete", ()),
+        # Missing anchors/terminators are where the lazy DOTALL patterns rescan the document.
+        ("missing labels", ("Category Of Importer", "IF SUPPLIER IS NOT THE SELLER", "Currency :", "Interest Amount")),
+    ]
+    for title, missing in scenarios:
+        print(f"\n=== BOE metadata, {title} ===")
+        print(f"{'pages':>6} {'chars':>10} {'per-field ms':>13} {'scanner ms':>11} {'speedup':>8}")
+        for pages in args.pages:
+            texts = [p["content"] for p in boe_pages(items=pages, missing=missing)]
+            text = " ".join(texts)
+            legacy_s, legacy = best_of(legacy_boe_metadata, text, args.repeat)
+            index = PageIndex(texts, BOE_SECTIONS)
+            scanner_s, scanned = best_of(lambda t: extract_boe_metadata(index), text, args.repeat)
+            if legacy != scanned:
+                raise SystemExit(f"❌ outputs differ at {pages} pages: {legacy} != {scanned}")
+            print(f"{pages:>6} {len(text):>10} {legacy_s * 1000:>13.3f} {scanner_s * 1000:>11.3f} {legacy_s / scanner_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import sys
+import math
+import time
+import argparse
+
+from synthetic import GENERATORS, adversarial_pages, defects
+from newapi import PARSERS
+
+# Parses every damaged variant of every document type at growing sizes and
+# fits the growth exponent of parse time against text size between the
+# smallest and largest run: ~1 is linear, 2 quadratic. A defect fails when
+# the exponent exceeds --max-exponent or the largest run exceeds its budget.
+
+
+def best_of(func, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(pages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worst-case parse time on truncated and label-damaged documents.")
+    parser.add_argument("--doc-types", nargs="+", default=sorted(GENERATORS), choices=sorted(GENERATORS))
+    parser.add_argument("--items", type=int, nargs="+", default=[200, 800, 3200])
+    parser.add_argument("--items-per-page", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="largest acceptable growth exponent")
+    parser.add_argument("--budget-ms", type=float, default=5000.0, help="parse-time budget for the largest size")
+    args = parser.parse_args()
+    sizes = sorted(args.items)
+
+    print(f"{'doc':<8} {'defect':<36} " + " ".join(f"{n:>8}" for n in sizes) + f" {'exponent':>9}")
+    failures = []
+    for doc_type in args.doc_types:
+        for defect in ["intact"] + defects(doc_type):
+            times, lengths = [], []
+            for items in sizes:
+                if defect == "intact":
+                    pages = GENERATORS[doc_type](items=items, items_per_page=args.items_per_page)
+                else:
+                    pages = adversarial_pages(doc_type, defect, items, args.items_per_page)
+                lengths.append(sum(len(p["content"]) for p in pages))
+                times.append(best_of(PARSERS[doc_type], pages, args.repeat))
+            exponent = (math.log(max(times[-1], 1e-6) / max(times[0], 1e-6)) / math.log(lengths[-1] / lengths[0])
+                        if len(sizes) > 1 else 1.0)
+            ok = exponent <= args.max_exponent and times[-1] * 1000 <= args.budget_ms
+            if not ok:
+                failures.append((doc_type, defect))
+            print(f"{doc_type:<8} {defect:<36} " + " ".join(f"{t * 1000:>8.1f}" for t in times)
+                  + f" {exponent:>9.2f}{'' if ok else ' ❌'}")
+
+    print(f"\nms per parse at {', '.join(map(str, sizes))} items")
+    if failures:
+        print(f"❌ {len(failures)} defect(s) grew faster than linear or ran over budget")
+        sys.exit(1)
+    print(f"✅ Every defect parses in linear time (exponent <= {args.max_exponent})")
+
+
+if __name__ == "__main__":
+    main()
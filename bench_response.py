@@ -0,0 +1,96 @@
+import os
+import time
+import argparse
+import threading
+
+from synthetic import boe_pages
+from newapi import parse_boe_pages
+from exporters import EXPORTERS, export_bytes, export_rows, format_error
+from workspace import create_job_dir, remove_job_dir
+
+# Compares the two ways a finished conversion reaches the client: exported
+# to a file in the job directory and read back by send_file (the old
+# /upload-pdf path), or exported into memory and sent from there (the
+# current one). Each variant runs concurrently, as gunicorn threads would.
+READ_SIZE = 8192  # werkzeug's FileWrapper block size
+
+
+def via_disk(rows, output_format):
+    job_id, job_dir = create_job_dir()
+    try:
+        path = export_rows(rows, "boe", output_format, os.path.join(job_dir, job_id))
+        size = 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(READ_SIZE), b""):
+                size += len(block)
+        return size
+    finally:
+        remove_job_dir(job_dir)
+
+
+def in_memory(rows, output_format):
+    return len(export_bytes(rows, "boe", output_format))
+
+
+def bytes_written():
+    # Bytes passed to write() by this process (Linux), None elsewhere.
+    try:
+        with open("/proc/self/io", "r", encoding="utf-8") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("wchar:"))
+    except (OSError, StopIteration):
+        return None
+
+
+def run(func, rows, output_format, requests, concurrency):
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            start = time.perf_counter()
+            func(rows, output_format)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    written = bytes_written()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    if written is not None:
+        written = (bytes_written() - written) / requests
+    latencies.sort()
+    return requests / wall, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)], written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Disk round trip vs in-memory output under concurrent requests.")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--formats", nargs="+", default=["xlsx", "csv"], choices=sorted(EXPORTERS))
+    args = parser.parse_args()
+
+    rows = parse_boe_pages(boe_pages(items=args.items, items_per_page=5))
+    print(f"{len(rows)} BOE rows, {args.requests} requests, {args.concurrency} threads\n")
+    print(f"{'format':<8} {'path':<10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'KB written/req':>15}")
+    for output_format in args.formats:
+        error = format_error(output_format)
+        if error:
+            print(f"⚠️ {output_format}: {error}")
+            continue
+        for name, func in (("disk", via_disk), ("memory", in_memory)):
+            rate, p50, p95, written = run(func, rows, output_format, args.requests, args.concurrency)
+            written = "n/a" if written is None else f"{written / 1024:.0f}"
+            print(f"{output_format:<8} {name:<10} {rate:>8.1f} {p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {written:>15}")
+
+
+if __name__ == "__main__":
+    main()
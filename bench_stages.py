@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+
+from synthetic import GENERATORS
+from stages import STAGES, record_stages, stage
+from newapi import PROCESSORS
+from exporters import DEFAULT_FORMAT, EXPORTERS
+
+# Times every stage of the processors on synthetic converter output, without
+# Chrome or the converter site: "load" is decoding the converter JSON, as on
+# a page-cache hit. Results can be saved and compared against a baseline.
+DEFAULT_BASELINE = os.path.join("bench_results", "stages.json")
+
+
+def run_case(doc_type, items, items_per_page, output_format, repeat, tmp):
+    raw = json.dumps(GENERATORS[doc_type](items=items, items_per_page=items_per_page))
+    pdf_path = os.path.join(tmp, f"{doc_type}_{items}.pdf")
+    best = {}
+    best_total = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with record_stages() as times:
+            with stage("load"):
+                pages = json.loads(raw)
+            PROCESSORS[doc_type](pdf_path, None, output_format, pages)
+        best_total = min(best_total, time.perf_counter() - start)
+        for name, seconds in times.items():
+            best[name] = min(best.get(name, float("inf")), seconds)
+    return {
+        "doc_type": doc_type,
+        "items": items,
+        "pages": len(pages),
+        "stages_ms": {name: round(best[name] * 1000, 3) for name in STAGES if name in best},
+        "total_ms": round(best_total * 1000, 3),
+    }
+
+
+def print_table(results):
+    names = [name for name in STAGES if any(name in r["stages_ms"] for r in results)]
+    print(f"{'doc':<8} {'items':>6} {'pages':>6} " + " ".join(f"{n:>9}" for n in names) + f" {'total ms':>9}")
+    for r in results:
+        cells = " ".join(f"{r['stages_ms'][n]:>9.2f}" if n in r["stages_ms"] else f"{'-':>9}" for n in names)
+        print(f"{r['doc_type']:<8} {r['items']:>6} {r['pages']:>6} {cells} {r['total_ms']:>9.2f}")
+
+
+def compare(results, baseline, threshold, floor_ms):
+    # A stage regresses when it is both `threshold` slower and `floor_ms`
+    # slower than the baseline; tiny stages are too noisy to compare alone.
+    previous = {(r["doc_type"], r["items"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n=== vs baseline ({baseline['meta'].get('recorded', '?')}, {baseline['meta'].get('machine', '?')}) ===")
+    for r in results:
+        old = previous.get((r["doc_type"], r["items"]))
+        if old is None:
+            continue
+        for name in STAGES + ["total"]:
+            new_ms = r["total_ms"] if name == "total" else r["stages_ms"].get(name)
+            old_ms = old["total_ms"] if name == "total" else old["stages_ms"].get(name)
+            if new_ms is None or not old_ms:
+                continue
+            regressed = new_ms / old_ms > 1 + threshold and new_ms - old_ms > floor_ms
+            if regressed:
+                regressions.append((r["doc_type"], r["items"], name))
+            # Totals always, single stages only when they regressed.
+            if regressed or name == "total":
+                print(f"{r['doc_type']:<8} {r['items']:>6} {name:<9} {old_ms:>9.2f} -> {new_ms:>9.2f} ms "
+                      f"({new_ms / old_ms:.2f}x){' ❌ regression' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage timings of the processors on synthetic documents.")
+    parser.add_argument("--doc-types", nargs="+", default=sorted(GENERATORS), choices=sorted(GENERATORS))
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--items-per-page", type=int, default=5)
+    parser.add_argument("--format", default=DEFAULT_FORMAT, choices=sorted(EXPORTERS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help=f"record results (default {DEFAULT_BASELINE})")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="compare against recorded results")
+    parser.add_argument("--threshold", type=float, default=0.5, help="relative slowdown that counts as a regression")
+    parser.add_argument("--floor-ms", type=float, default=2.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_case(doc_type, items, args.items_per_page, args.format, args.repeat, tmp)
+                   for doc_type in args.doc_types for items in args.items]
+    print_table(results)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold, args.floor_ms)
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        meta = {
+            "recorded": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+            "python": platform.python_version(),
+            "format": args.format,
+            "items_per_page": args.items_per_page,
+            "repeat": args.repeat,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=1)
+        print(f"✅ Results saved to {args.save}")
+    if regressions:
+        print(f"❌ {len(regressions)} stage regression(s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
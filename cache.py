@@ -0,0 +1,133 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+
+import metrics
+
+CACHE_ENABLED = os.environ.get("RESULT_CACHE", "1") != "0"
+CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pdf_to_excel_cache"))
+CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# Eviction frees space down to this share of the cap, so a full cache is not
+# rescanned on every store.
+EVICT_TO = 0.9
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+
+
+class ResultCache:
+    """On-disk LRU of converter pages and finished workbooks.
+
+    Each entry is one file named ``<key><ext>``; a hit bumps its mtime and
+    stores evict the least recently used entries once the directory grows
+    past ``max_bytes``. The directory is only rescanned when a running total
+    (its size at the last scan plus this process's stores since) crosses
+    ``max_bytes``. Writes go through a temp file and ``os.replace`` so
+    concurrent workers never read a partial entry.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, enabled=CACHE_ENABLED):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._total = None  # bytes in the directory; None until first scanned
+        if enabled:
+            os.makedirs(root, exist_ok=True)
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, key + ext)
+
+    def get_path(self, key, ext):
+        if not self.enabled:
+            return None
+        path = self._path(key, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def load_json(self, key):
+        path = self.get_path(key, ".json")
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, ext, write):
+        if not self.enabled:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        path = self._path(key, ext)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+                size = f.tell()
+            try:
+                size -= os.path.getsize(path)  # an entry being replaced
+            except OSError:
+                pass
+            os.replace(tmp, path)
+        except Exception:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            if self._total is not None:
+                self._total += size
+            full = self._total is None or self._total > self.max_bytes
+        if full:
+            self.evict()
+
+    def store_json(self, key, data):
+        self._store(key, ".json", lambda f: f.write(json.dumps(data).encode("utf-8")))
+
+    def store_bytes(self, key, ext, data):
+        self._store(key, ext, lambda f: f.write(data))
+
+    def store_file(self, key, ext, src_path):
+        def copy(f):
+            with open(src_path, "rb") as src:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    f.write(chunk)
+        self._store(key, ext, copy)
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                metrics.inc("pdf_cache_evictions_total")
+                total -= size
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+        with self._lock:
+            self._total = total
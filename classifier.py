@@ -0,0 +1,49 @@
+import json
+import time
+import argparse
+
+from field_specs import DOC_TYPE_MARKERS
+
+AUTO = "auto"
+# The markers are header labels, so only the start of the first page is
+# searched; detection stays a few substring scans however long the page.
+CLASSIFY_WINDOW = 4000
+
+
+def classify_text(text):
+    # Earliest marker wins: a header that mentions another document type
+    # further down is still typed by its own title.
+    head = text[:CLASSIFY_WINDOW]
+    best = None
+    for doc_type, markers in DOC_TYPE_MARKERS.items():
+        for marker in markers:
+            pos = head.find(marker)
+            if pos != -1 and (best is None or pos < best[0]):
+                best = (pos, doc_type)
+    return best[1] if best else None
+
+
+def detect_doc_type(pages):
+    """Doc type of converter output from its first non-blank page, or None."""
+    for page in pages:
+        content = page.get("content") or ""
+        if content.strip():
+            return classify_text(content)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect the document type of converter JSON page lists.")
+    parser.add_argument("pages", nargs="+", help="converter JSON, e.g. from synthetic.py")
+    args = parser.parse_args()
+
+    for path in args.pages:
+        with open(path, "r", encoding="utf-8") as f:
+            pages = json.load(f)
+        start = time.perf_counter()
+        doc_type = detect_doc_type(pages)
+        print(f"{path}: {doc_type or 'unknown'} ({(time.perf_counter() - start) * 1e6:.0f} µs)")
+
+
+if __name__ == "__main__":
+    main()
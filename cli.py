@@ -0,0 +1,170 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from batch import BATCH_PROCESSES, batch_summary, new_executor, timed_call
+from field_specs import REGISTRY
+from classifier import AUTO
+from exporters import DEFAULT_FORMAT, EXPORTERS, export_rows, extension, format_error
+
+# Exit codes for cron: everything converted / some files failed / bad usage
+# or nothing to convert.
+EXIT_OK, EXIT_FAILED, EXIT_USAGE = 0, 1, 2
+
+
+def convert_file(doc_type, pdf_path, backend, output_format, output_base):
+    # Runs in a pool worker; newapi (flask, selenium) loads once per process.
+    from newapi import parse_document
+    doc_type, rows = parse_document(doc_type, pdf_path, backend)
+    return {"doc_type": doc_type, "rows": len(rows), "output": export_rows(rows, doc_type, output_format, output_base)}
+
+
+# ===================== INPUTS =====================
+def find_pdfs(inputs):
+    # Files, globs (** recurses) and directories (searched recursively), in
+    # the order given, each PDF once; inputs matching nothing are returned
+    # separately so they can be warned about.
+    found, missing = [], []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(os.path.join(root, name) for root, _, names in os.walk(item)
+                             for name in names if name.lower().endswith(".pdf"))
+        elif os.path.isfile(item):
+            matches = [item]
+        else:
+            matches = sorted(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+        if not matches:
+            missing.append(item)
+        found.extend(matches)
+    return list(dict.fromkeys(found)), missing
+
+
+def output_bases(paths, output_dir):
+    # <output_dir>/<stem>, numbered when two inputs share a stem; without
+    # --output-dir each output lands next to its PDF.
+    bases, used = [], set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        folder = output_dir or os.path.dirname(path)
+        base, n = os.path.join(folder, stem), 1
+        while base in used:
+            n += 1
+            base = os.path.join(folder, f"{stem}_{n}")
+        used.add(base)
+        bases.append(base)
+    return bases
+
+
+# ===================== PROGRESS =====================
+def progress_bar(done, total, failed, start, width=30):
+    if not sys.stderr.isatty():
+        return
+    filled = width * done // total if total else width
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed else 0.0
+    sys.stderr.write(f"\r[{'#' * filled}{'-' * (width - filled)}] {done}/{total} files, "
+                     f"{failed} failed, {rate:.1f} files/s")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+# ===================== RUN =====================
+def run(paths, doc_type, output_format, output_dir=None, jobs=BATCH_PROCESSES, backend=None):
+    start = time.perf_counter()
+    results = [{
+        "file": path,
+        "doc_type": doc_type,
+        "status": "failed",
+        "rows": 0,
+        "output": None,
+        "seconds": 0.0,
+        "error": "",
+    } for path in paths]
+    args = [(doc_type, path, backend, output_format, base) for path, base in zip(paths, output_bases(paths, output_dir))]
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    def record(i, outcome):
+        value, error, seconds = outcome
+        results[i].update(seconds=round(seconds, 4), error=error or "")
+        if not error:
+            results[i].update(status="ok", **value)
+        else:
+            # Off the progress bar's line when one is being drawn.
+            newline = "\n" if sys.stderr.isatty() else ""
+            print(f"{newline}❌ {paths[i]}: {error}", file=sys.stderr)
+
+    done = failed = 0
+    if jobs <= 1:
+        for i, task in enumerate(args):
+            record(i, timed_call(convert_file, *task))
+            done += 1
+            failed += results[i]["status"] == "failed"
+            progress_bar(done, len(paths), failed, start)
+    else:
+        with new_executor(jobs) as executor:
+            futures = {executor.submit(timed_call, convert_file, *task): i for i, task in enumerate(args)}
+            for future in as_completed(futures):
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool as e:
+                    outcome = (None, f"Worker process died: {e}", 0.0)
+                record(futures[future], outcome)
+                done += 1
+                failed += results[futures[future]]["status"] == "failed"
+                progress_bar(done, len(paths), failed, start)
+    return results, batch_summary(results, time.perf_counter() - start)
+
+
+def write_report(report_path, results, summary):
+    report = json.dumps({"summary": summary, "files": results}, indent=2)
+    if report_path == "-":
+        print(report)
+        return
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(report)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert BOE and courier PDFs to spreadsheets.",
+        epilog=f"Exit status: {EXIT_OK} all converted, {EXIT_FAILED} some files failed, "
+               f"{EXIT_USAGE} bad arguments or no PDFs found.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, globs (quote them; ** recurses) or directories")
+    parser.add_argument("-t", "--doc-type", default=AUTO, choices=sorted(REGISTRY) + [AUTO],
+                        help="document type, or auto to detect it from each file's first page (default)")
+    parser.add_argument("-f", "--format", default=DEFAULT_FORMAT, choices=sorted(EXPORTERS))
+    parser.add_argument("-o", "--output-dir", help="where outputs go (default: next to each PDF)")
+    parser.add_argument("-j", "--jobs", type=int, default=BATCH_PROCESSES, help="worker processes")
+    parser.add_argument("--backend", help="converter backend, defaults to PDF_BACKEND")
+    parser.add_argument("--report", help="write a JSON report of every file to this path ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    error = format_error(args.format)
+    if error:
+        print(f"❌ {error}", file=sys.stderr)
+        return EXIT_USAGE
+    paths, missing = find_pdfs(args.inputs)
+    for item in missing:
+        print(f"⚠️ No PDFs match {item}", file=sys.stderr)
+    if not paths:
+        print("❌ Nothing to convert", file=sys.stderr)
+        return EXIT_USAGE
+
+    results, summary = run(paths, args.doc_type, args.format, args.output_dir, max(1, args.jobs), args.backend)
+    if args.report:
+        write_report(args.report, results, summary)
+    print(f"{'✅' if not summary['failed'] else '⚠️'} {summary['files'] - summary['failed']}/{summary['files']} "
+          f"converted to {extension(args.format)} in {summary['seconds']}s "
+          f"({summary['files_per_second']} files/s)", file=sys.stderr)
+    return EXIT_FAILED if summary["failed"] else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
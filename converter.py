@@ -0,0 +1,88 @@
+import os
+import json
+import shutil
+import tempfile
+from contextlib import ExitStack
+from download_wait import DOWNLOAD_TIMEOUT, wait_for_download
+from deadline import active, check, remaining
+from stages import stage
+
+CONVERTER_URL = os.environ.get("CONVERTER_URL", "https://ilovepdf4.com/pdf-to-json/")
+DEFAULT_BACKEND = os.environ.get("PDF_BACKEND", "local")
+
+
+# ===================== LOCAL BACKEND (pypdf, no browser) =====================
+def convert_local(pdf_path):
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    pages = []
+    for i, page in enumerate(reader.pages, 1):
+        check()  # a long PDF can be cancelled between pages
+        pages.append({"page": i, "content": page.extract_text() or ""})
+    return pages
+
+
+# ===================== SELENIUM BACKEND (ilovepdf4 round-trip) =====================
+def convert_selenium(pdf_path):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from driver_pool import CHECKOUT_TIMEOUT, get_pool
+
+    # Every conversion downloads into its own directory so concurrent jobs
+    # never see (or delete) each other's converted.json.
+    download_folder = tempfile.mkdtemp(prefix="download-", dir=os.path.dirname(pdf_path))
+    json_path = os.path.join(download_folder, "converted.json")
+
+    try:
+        with ExitStack() as session:
+            # Checking out (or launching) Chrome is timed apart from the upload.
+            with stage("browser"):
+                driver = session.enter_context(
+                    get_pool(CONVERTER_URL).session(download_folder, remaining(CHECKOUT_TIMEOUT)))
+            # Cancellation quits the browser, failing whichever call is
+            # blocked on it; the pool then replaces the session.
+            deadline = active()
+            if deadline:
+                session.enter_context(deadline.watching(driver.quit))
+            wait = WebDriverWait(driver, remaining(20))
+
+            with stage("upload"):
+                try:
+                    iframe = wait.until(EC.presence_of_element_located((By.TAG_NAME, "iframe")))
+                    driver.switch_to.frame(iframe)
+                except:
+                    pass
+
+                upload_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
+                upload_input.send_keys(pdf_path)
+
+                convert_btn = wait.until(EC.element_to_be_clickable((By.ID, "convertButton")))
+                convert_btn.click()
+
+            with stage("poll"):
+                wait_for_download(json_path, remaining(DOWNLOAD_TIMEOUT), deadline.cancelled if deadline else None)
+                check()
+
+        if not os.path.exists(json_path):
+            raise FileNotFoundError("Converted JSON file not found.")
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    finally:
+        shutil.rmtree(download_folder, ignore_errors=True)
+    return data
+
+
+BACKENDS = {
+    "local": convert_local,
+    "selenium": convert_selenium,
+}
+
+
+def convert_pdf(pdf_path, backend=None):
+    name = backend or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown converter backend: {name}")
+    return BACKENDS[name](pdf_path)
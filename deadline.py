@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# Wall-clock budget of one conversion, counted from its request (time in
+# the queue included) to the written output; 0 disables it.
+CONVERSION_TIMEOUT = float(os.environ.get("CONVERSION_TIMEOUT", "120"))
+
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """Raised on a job's thread once its deadline has passed or it was cancelled."""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+
+class Deadline:
+    """Expiry time and cancellation state of one conversion.
+
+    Work on the job's thread calls check() between steps. Blocking steps
+    (a Chrome session, the download wait) register a callback with
+    watching() that unblocks them - e.g. quitting the browser - which
+    runs the moment cancel() is called, from whichever thread calls it;
+    start() arms a timer that cancels with "timeout" at the deadline.
+    """
+
+    def __init__(self, timeout=CONVERSION_TIMEOUT):
+        self.timeout = timeout
+        self.expires = time.monotonic() + timeout if timeout else None
+        self.reason = None
+        self.message = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def remaining(self, default=None):
+        # Seconds left, at most `default` (None: no limit of its own).
+        if self.expires is None:
+            return default
+        left = max(0.0, self.expires - time.monotonic())
+        return left if default is None else min(default, left)
+
+    def cancelled(self):
+        if self.reason is None and self.expires is not None and time.monotonic() >= self.expires:
+            self.cancel("timeout")
+        return self.reason is not None
+
+    def check(self):
+        if self.cancelled():
+            raise Cancelled(self.reason, self.message)
+
+    def cancel(self, reason="cancelled", detail=None):
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+            self.message = (f"Conversion timed out after {self.timeout:g}s" if reason == "timeout"
+                            else f"Conversion cancelled: {detail or 'cancelled by the client'}")
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Cancel callback failed: {e}")
+
+    @contextmanager
+    def watching(self, callback):
+        # Runs `callback` if the conversion is cancelled inside the block.
+        with self._lock:
+            self._callbacks.append(callback)
+            fire = self.reason is not None
+        try:
+            if fire:
+                callback()
+            yield
+        finally:
+            with self._lock:
+                self._callbacks.remove(callback)
+
+    def start(self):
+        if self.expires is not None and self._timer is None:
+            self._timer = threading.Timer(self.remaining(), self.cancel, ("timeout",))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+
+
+# ===================== ACTIVE DEADLINE (per thread) =====================
+@contextmanager
+def running(deadline):
+    """Makes `deadline` the one check() and remaining() see on this thread."""
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = deadline
+    deadline.start()
+    try:
+        yield deadline
+    finally:
+        deadline.stop()
+        _local.deadline = previous
+
+
+def active():
+    return getattr(_local, "deadline", None)
+
+
+def check():
+    # A cancellation point; a no-op outside a job.
+    deadline = getattr(_local, "deadline", None)
+    if deadline is not None:
+        deadline.check()
+
+
+def remaining(default):
+    deadline = getattr(_local, "deadline", None)
+    return default if deadline is None else deadline.remaining(default)
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import select
+
+DOWNLOAD_TIMEOUT = float(os.environ.get("DOWNLOAD_TIMEOUT", "30"))
+POLL_INTERVAL = 0.05
+# How often a wait that can be cancelled looks at its cancelled() callback.
+CANCEL_INTERVAL = 0.25
+PARTIAL_SUFFIX = ".crdownload"
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        import ctypes
+        import ctypes.util
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return _libc
+
+
+def _is_complete(path, started):
+    # Chrome writes "<name>.crdownload" (or "Unconfirmed NNN.crdownload") and
+    # renames it once finished, so the final name only appears when the file
+    # is whole. Only partials that can be this download count: its own, or an
+    # unconfirmed one written since the wait began (not an orphan left in a
+    # shared Downloads folder by some other download).
+    if not os.path.exists(path) or os.path.exists(path + PARTIAL_SUFFIX):
+        return False
+    folder = os.path.dirname(path) or "."
+    for entry in os.scandir(folder):
+        if entry.name.startswith("Unconfirmed ") and entry.name.endswith(PARTIAL_SUFFIX):
+            try:
+                if entry.stat().st_mtime >= started:
+                    return False
+            except OSError:
+                pass
+    return True
+
+
+def _wait_inotify(path, deadline, started, cancelled=None):
+    import ctypes
+
+    libc = _load_libc()
+    folder = os.path.dirname(path) or "."
+
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    try:
+        if libc.inotify_add_watch(fd, os.fsencode(folder), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+        # Check before every wait: the file may have landed before the watch
+        # was in place, and any close/rename in the folder is worth a look.
+        while not _is_complete(path, started):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (cancelled and cancelled()):
+                return False
+            if cancelled:
+                remaining = min(remaining, CANCEL_INTERVAL)
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if readable:
+                try:
+                    os.read(fd, 4096)
+                except BlockingIOError:
+                    pass
+        return True
+    finally:
+        os.close(fd)
+
+
+def _wait_polling(path, deadline, started, cancelled=None):
+    last_size = -1
+    while time.monotonic() < deadline:
+        if cancelled and cancelled():
+            return False
+        if _is_complete(path, started):
+            # Without rename events, also require the size to settle so a
+            # file written in place is not read half-way through.
+            size = os.path.getsize(path)
+            if size == last_size:
+                return True
+            last_size = size
+        time.sleep(POLL_INTERVAL)
+    return _is_complete(path, started)
+
+
+def wait_for_download(path, timeout=DOWNLOAD_TIMEOUT, cancelled=None):
+    # `cancelled`, if given, is polled while waiting; once it returns True
+    # the wait gives up like a timeout.
+    deadline = time.monotonic() + timeout
+    started = time.time()  # compared with partial files' mtimes
+    if sys.platform.startswith("linux"):
+        try:
+            return _wait_inotify(path, deadline, started, cancelled)
+        except OSError:
+            pass
+    return _wait_polling(path, deadline, started, cancelled)
@@ -0,0 +1,167 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+POOL_SIZE = int(os.environ.get("CHROME_POOL_SIZE", "2"))
+MAX_JOBS_PER_DRIVER = int(os.environ.get("CHROME_MAX_JOBS", "50"))
+CHECKOUT_TIMEOUT = float(os.environ.get("CHROME_CHECKOUT_TIMEOUT", "60"))
+HEADLESS = os.environ.get("CHROME_HEADLESS", "1") != "0"
+PREWARM = os.environ.get("CHROME_PREWARM", "1") != "0"
+
+
+def launch_chrome():
+    from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    if HEADLESS:
+        options.add_argument("--headless=new")
+    options.add_experimental_option("prefs", {
+        "download.prompt_for_download": False,
+        "directory_upgrade": True
+    })
+    return Chrome(options=options)
+
+
+class DriverPool:
+    """Bounded pool of pre-launched Chrome sessions parked on the converter page.
+
+    Slots start empty and are filled on first checkout (or by ``warm()``).
+    A session is health-checked on checkout, re-navigated on return and
+    recycled after ``max_jobs`` conversions or any failure.
+    """
+
+    def __init__(self, url, size=POOL_SIZE, max_jobs=MAX_JOBS_PER_DRIVER, factory=launch_chrome):
+        self.url = url
+        self.size = size
+        self.max_jobs = max_jobs
+        self.factory = factory
+        self._slots = queue.Queue(maxsize=size)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(size):
+            self._slots.put(None)
+
+    def _launch(self):
+        driver = self.factory()
+        try:
+            driver.get(self.url)
+        except Exception:
+            self._quit(driver)
+            raise
+        with self._lock:
+            self._jobs[id(driver)] = 0
+        return driver
+
+    def _quit(self, driver):
+        with self._lock:
+            self._jobs.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _healthy(self, driver):
+        try:
+            driver.switch_to.default_content()
+            return driver.current_url.startswith(self.url)
+        except Exception:
+            return False
+
+    def warm(self):
+        # Every driver checked out here goes back, even if a later launch
+        # fails; the slots left empty are filled on checkout.
+        drivers = []
+        try:
+            for _ in range(self.size):
+                drivers.append(self.acquire())
+        except Exception as e:
+            print(f"⚠️ Could not pre-launch Chrome: {e}")
+        finally:
+            for driver in drivers:
+                self.release(driver)
+
+    def acquire(self, timeout=CHECKOUT_TIMEOUT):
+        if self._closed:
+            raise RuntimeError("Driver pool is closed.")
+        try:
+            driver = self._slots.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No Chrome session available in the pool.")
+        try:
+            if driver is not None and not self._healthy(driver):
+                self._quit(driver)
+                driver = None
+            if driver is None:
+                driver = self._launch()
+        except Exception:
+            self._slots.put(None)
+            raise
+        return driver
+
+    def release(self, driver, broken=False):
+        with self._lock:
+            jobs = self._jobs.get(id(driver), 0) + 1
+            self._jobs[id(driver)] = jobs
+        if self._closed or broken or jobs >= self.max_jobs:
+            self._quit(driver)
+            self._slots.put(None)
+            return
+        try:
+            driver.switch_to.default_content()
+            driver.get(self.url)
+        except Exception:
+            self._quit(driver)
+            driver = None
+        self._slots.put(driver)
+
+    @contextmanager
+    def session(self, download_folder=None, timeout=CHECKOUT_TIMEOUT):
+        driver = self.acquire(timeout)
+        try:
+            if download_folder:
+                driver.execute_cdp_cmd("Page.setDownloadBehavior", {
+                    "behavior": "allow",
+                    "downloadPath": download_folder
+                })
+            yield driver
+        except BaseException:
+            self.release(driver, broken=True)
+            raise
+        self.release(driver)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                driver = self._slots.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                self._quit(driver)
+
+
+# One pool per process: gunicorn workers each build their own after fork.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(url):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(url)
+            if PREWARM:
+                threading.Thread(target=_pool.warm, daemon=True).start()
+        return _pool
+
+
+def prelaunch():
+    # Called as a server worker starts, so with the selenium backend Chrome
+    # is already up for the first conversion instead of launched by it.
+    from converter import CONVERTER_URL, DEFAULT_BACKEND
+
+    if DEFAULT_BACKEND == "selenium":
+        get_pool(CONVERTER_URL)
@@ -0,0 +1,395 @@
+import re
+import time
+import argparse
+from collections import namedtuple
+import numpy as np
+
+from label_scanner import LabelScanner, bounded, field
+
+# Every column the parsers emit is declared here once, with its value type
+# ("text", "number", "date") and scope ("document" = once per file, "item" =
+# once per line item, "duty" = per item from the duty table). Label fields
+# run through a precompiled LabelScanner; columns that come out of a multi-
+# group record pattern (BOE items, duties, challan) are listed as Column.
+# Patterns with lazy ".*?" values are compiled with label_scanner.bounded. In
+# record patterns each value sits in an atomic group (?>...) that ends at
+# the next label: the value stops at the first occurrence of that label and
+# is never re-chosen when a later label is missing. Without that, a record
+# missing one label tries every combination of the earlier labels' later
+# occurrences, which is exponential in the number of values.
+Column = namedtuple("Column", "column value_type scope")
+
+# Token fields read up to the next whitespace, like r"Label\s*:\s*(.*?)\s".
+TOKEN = r"\s*:\s*(.*?)\s"
+NUMBER = r"\s*:\s*(\d+\.?\d*)"
+
+
+def between(column, label, end, **kwargs):
+    # Same match as the old get_between(label, end, text), including its
+    # "Not Found" default.
+    return field(column, label, rf"\s*:\s*(.*?)\s*{re.escape(end)}", until=end, default="Not Found", **kwargs)
+
+
+# ===================== DUTIES (both document types) =====================
+DUTY_TYPES = ["BCD", "AIDC", "SW SRCHRG", "IGST", "CMPNSTRY"]
+DUTY_MEASURES = ["ad_valorem", "specific_rate", "duty_forgone", "duty_amount"]
+DUTY_PATTERN = re.compile(
+    r"(BCD|AIDC|SW SRCHRG|IGST|CMPNSTRY)\s+"
+    r"(\d+(?:\.\d+)?)\s+"
+    r"(\d+(?:\.\d+)?)\s+"
+    r"(\d+(?:\.\d+)?)\s+"
+    r"(\d+(?:\.\d+)?)", re.IGNORECASE
+)
+DUTY_COLUMNS = [Column(f"{duty.lower().replace(' ', '_')}_{measure}", "number", "duty")
+                for duty in DUTY_TYPES for measure in DUTY_MEASURES]
+# Row key ("sw_srchrg_duty_amount") -> (duty type, measure).
+DUTY_KEYS = {f"{key}_{measure}": (key, measure)
+             for key in (duty.lower().replace(" ", "_") for duty in DUTY_TYPES) for measure in DUTY_MEASURES}
+
+
+def duty_rows(matches):
+    # One row per item: consecutive groups of len(DUTY_TYPES) duty lines.
+    rows = []
+    for i in range(0, len(matches), len(DUTY_TYPES)):
+        row = {}
+        for duty, *amounts in matches[i:i + len(DUTY_TYPES)]:
+            key = duty.lower().replace(" ", "_")
+            for measure, amount in zip(DUTY_MEASURES, amounts):
+                row[f"{key}_{measure}"] = float(amount)
+        rows.append(row)
+    return rows
+
+
+def duty_table(matches, rows=None, row_count=None):
+    # Columnar pd.DataFrame(duty_rows(matches)): one row per group, one
+    # column per duty type/measure in first-seen order, NaN where a row has
+    # no line for a duty type. Returns (columns, 2-D float array). `rows`
+    # gives each match's row when lines are already tied to their item
+    # (default: consecutive groups of len(DUTY_TYPES)); `row_count` pads the
+    # table for trailing items without duty lines.
+    if not matches:
+        return [], np.empty((row_count or 0, 0))
+    keys = [duty.lower().replace(" ", "_") for duty, *_ in matches]
+    order = {key: c for c, key in enumerate(dict.fromkeys(keys))}
+    codes = np.fromiter((order[key] for key in keys), dtype=np.intp, count=len(keys))
+    amounts = np.array([amounts for _, *amounts in matches], dtype=float)
+    if rows is None:
+        rows = np.arange(len(matches)) // len(DUTY_TYPES)
+    else:
+        rows = np.asarray(rows, dtype=np.intp)
+
+    width = len(DUTY_MEASURES)
+    table = np.full((row_count if row_count is not None else rows.max() + 1, len(order) * width), np.nan)
+    for key, c in order.items():
+        idx = np.flatnonzero(codes == c)[::-1]
+        # A duty type repeated within one row keeps its last line, like the dict did.
+        target, last = np.unique(rows[idx], return_index=True)
+        table[target, c * width:(c + 1) * width] = amounts[idx[last]]
+    columns = [f"{key}_{measure}" for key in order for measure in DUTY_MEASURES]
+    return columns, table
+
+
+# ===================== COURIER (CBE-XIII) =====================
+COURIER_DOCUMENT_FIELDS = [
+    field("CBE Number", "CBE-XIII Number", r"\s*([A-Z0-9_/-]+)"),
+    field("HAWB Number", "HAWB Number", r"\s*:\s*(\S+)"),
+    between("Name of Consignor", "Name of Consignor", "Address of Consignor"),
+    between("Address of Consignor", "Address of Consignor", "Name of Consignee"),
+    between("Name of Consignee", "Name of Consignee", "Address of Consignee"),
+    between("Address of Consignee", "Address of Consignee", "Import Export Code"),
+    field("Interest Amount", "Interest Amount", r"\s*:\s*(\S+)", value_type="number"),
+]
+COURIER_CHALLAN = bounded(r"TR-6 Challan Number\s+Total Amount\s+Challan Date\s+(.*?)\s+DECLARATION")
+COURIER_CHALLAN_VALUES = re.compile(r"(\d+)\s+(\d+)\s+(\d{2}/\d{2}/\d{4})")
+COURIER_CHALLAN_COLUMNS = [
+    Column("TR-6 Challan Number", "text", "document"),
+    Column("Total Amount", "number", "document"),
+    Column("Challan Date", "date", "document"),
+]
+
+COURIER_ITEM_BLOCK = bounded(r"ITEM\s*:(.*?)NOTIFICATION USED FOR THE ITEM")
+COURIER_ITEM_FIELDS = [
+    field("Country of Origin", "Country of Origin", TOKEN, scope="item"),
+    between("Description of Goods", "Description of Goods", "Name of Manufacturer", scope="item"),
+    field("Quantity", "Quantity", r"\s*:\s*(\d+)", value_type="number", scope="item"),
+    field("Invoice Value", "Invoice Value", NUMBER, value_type="number", scope="item"),
+    field("Unit Price", "Unit Price", NUMBER, value_type="number", scope="item"),
+    field("Currency", "Currency of Unit Price", r"\s*:\s*(\w+)", scope="item"),
+    field("Rate of Exchange", "Rate of Exchange", NUMBER, value_type="number", scope="item"),
+    field("Assessable Value", "Assessable Value", NUMBER, value_type="number", scope="item"),
+    field("Insurance", "Insurance", NUMBER, value_type="number", scope="item"),
+    field("Freight", "Freight", NUMBER, value_type="number", scope="item"),
+    between("Name of Manufacturer", "Name of Manufacturer", "Address of Manufacturer", scope="item"),
+]
+COURIER_BLANK_COLUMNS = ["BE Type", "CB Name", "Total freight", "Total insurance", "Incoterms",
+                         "Penalty Amount", "Fine Amount"]
+
+# Section headers indexed per page (see page_index.PageIndex). Duty lines
+# have no header of their own and are read page by page instead.
+COURIER_SECTIONS = {
+    "item": "ITEM",
+    "challan": "TR-6 Challan Number",
+}
+
+COURIER_DOCUMENT_SCANNER = LabelScanner(COURIER_DOCUMENT_FIELDS)
+COURIER_ITEM_SCANNER = LabelScanner(COURIER_ITEM_FIELDS)
+
+# ===================== BOE (CBEXIV) =====================
+BOE_DOCUMENT_FIELDS = [
+    field("CBEXIV Number", "CBEXIV Number", TOKEN),
+    field("Importer Name", "Name", r"\s*:\s*(.*?)\s+Address",
+          anchor="Import Export Branch Code", anchor_tail=r"\s*:\s*", until="Address"),
+    field("Importer Address", "Address", r"\s*:\s*(.*?)\s*Category Of Importer",
+          anchor="Import Export Branch Code", anchor_tail=r"\s*:\s*", until="Category Of Importer"),
+    field("Supplier Name", "Name", r"\s*:\s*(.*?)\s+Address",
+          anchor="SUPPLIER DETAILS", anchor_tail=r"\s", until="Address"),
+    field("Supplier Address", "Address", r"\s*:\s*(.*?)\s*IF SUPPLIER IS NOT THE SELLER",
+          anchor="SUPPLIER DETAILS", anchor_tail=r"\s", until="IF SUPPLIER IS NOT THE SELLER"),
+    field("BOE Date", "BOE Date", TOKEN, value_type="date"),
+    field("Country of Origin", "Country of Origin", TOKEN),
+    field("Country of Consignment", "Country of Consignment", TOKEN),
+    field("House Airway Bill (HAWB) Number", "House Airway Bill (HAWB) Number", TOKEN),
+    field("Master Airway Bill (MAWB) Number", "Master Airway Bill (MAWB) Number", TOKEN),
+    field("Interest Amount", "Interest Amount", TOKEN, value_type="number"),
+    field("Invoice Number", "Invoice Number", TOKEN),
+    field("Date of Invoice", "Date of Invoice", TOKEN, value_type="date"),
+    field("Invoice Value", "Invoice Value", TOKEN, value_type="number"),
+    field("Currency", "Currency", r"\s*:\s*(USD|INR|EUR|[A-Z]{3})"),
+]
+BOE_CHALLAN = bounded(r"Challan Date\s*(.*?)\s*DECLARATION")
+BOE_CHALLAN_VALUES = re.compile(r"(\d+)\s+(\d+)\s+(\d+)\s+(\d{2}/\d{2}/\d{4})")
+BOE_CHALLAN_COLUMNS = COURIER_CHALLAN_COLUMNS
+
+BOE_FREIGHT = bounded(r"Currency Freight\s*:\s*(.*?)\s*Loading")
+BOE_FREIGHT_VALUES = re.compile(
+    r"(\d+\.?\d*)\s+(\d+\.?\d*)\s+([A-Z]{3})\s+Insurance\s*:\s*(\d+\.?\d*)\s+(\d+\.?\d*)\s+([A-Z]{3})"
+)
+BOE_FREIGHT_COLUMNS = [
+    Column("freight_rate", "number", "document"),
+    Column("freight_amount", "number", "document"),
+    Column("freight_currency", "text", "document"),
+    Column("insurance_rate", "number", "document"),
+    Column("insurance_amount", "number", "document"),
+    Column("insurance_currency", "text", "document"),
+]
+
+BOE_ITEM_PATTERN = bounded(
+    r"Item Description(?>\s*:\s*(.*?)\s*General Description)\s*:\s*"
+    r"Currency for Unit Price(?>\s*:\s*(.*?)\s*Unit Price)"
+    r"(?>\s*:\s*(.*?)\s*Unit of Measure)"
+    r"(?>\s*:\s*(.*?)\s*Quantity)"
+    r"(?>\s*:\s*(.*?)\s*Rate Of Exchange)"
+    r"(?>\s*:\s*(.*?)\s*Accessories)"
+    r"(?>.*?Assessable Value\s*:\s*(\d+\.?\d*))"
+)
+BOE_ITEM_COLUMNS = [
+    Column("Item Description", "text", "item"),
+    Column("Currency for Unit Price", "text", "item"),
+    Column("Unit Price", "number", "item"),
+    Column("Unit of Measure", "text", "item"),
+    Column("Quantity", "number", "item"),
+    Column("Rate Of Exchange", "number", "item"),
+    Column("Assessable Value", "number", "item"),
+]
+BOE_MANUFACTURER = bounded(r"Name of Manufacturer\s*:\s*(.*?)\s*Brand\s*:")
+BOE_MANUFACTURER_COLUMN = Column("Name of Manufacturer", "text", "item")
+BOE_BLANK_COLUMNS = ["BE Type", "CB Name", "Total freight", "Total insurance", "Incoterms",
+                     "penalty_amount", "fine_amount"]
+
+BOE_SECTIONS = {
+    "supplier": "SUPPLIER DETAILS",
+    "item": "Item Description",
+    "manufacturer": "Name of Manufacturer",
+    "freight": "Currency Freight",
+    "challan": "Challan Date",
+}
+
+BOE_DOCUMENT_SCANNER = LabelScanner(BOE_DOCUMENT_FIELDS)
+
+# ===================== CARGO (bill of entry for home consumption) =====================
+# Sea-cargo BOEs: one header, several invoices, hundreds of items. Each item
+# names its invoice by serial number and carries its own duty table, so
+# items and duties are matched per "ITEM DETAILS" block rather than by
+# position, and invoice columns are joined onto the items by that key.
+CARGO_DOCUMENT_FIELDS = [
+    field("BE No", "BE No", TOKEN),
+    field("BE Date", "BE Date", TOKEN, value_type="date"),
+    field("BE Type", "BE Type", TOKEN),
+    field("Port Code", "Port Code", TOKEN),
+    field("IEC", "IEC", TOKEN),
+    field("GSTIN", "GSTIN", TOKEN),
+    field("Importer Name", "Importer Name", r"\s*:\s*(.*?)\s*Importer Address", until="Importer Address"),
+    field("Importer Address", "Importer Address", r"\s*:\s*(.*?)\s*CB Code", until="CB Code"),
+    field("CB Code", "CB Code", TOKEN),
+    field("CB Name", "CB Name", r"\s*:\s*(.*?)\s*IGM No", until="IGM No"),
+    field("IGM No", "IGM No", TOKEN),
+    field("IGM Date", "IGM Date", TOKEN, value_type="date"),
+    field("Port of Loading", "Port of Loading", TOKEN),
+    field("Country of Consignment", "Country of Consignment", TOKEN),
+    field("Bill of Lading No", "Bill of Lading No", TOKEN),
+    field("B/L Date", "B/L Date", TOKEN, value_type="date"),
+    field("Gross Weight", "Gross Weight", NUMBER, value_type="number"),
+    field("Packages", "Packages", NUMBER, value_type="number"),
+]
+CARGO_PAYMENT_FIELDS = [
+    field("Challan Number", "Challan Number", TOKEN),
+    field("Challan Date", "Paid On", TOKEN, value_type="date"),
+    field("Total Amount", "Total Amount", NUMBER, value_type="number"),
+    field("Interest Amount", "Interest Amount", NUMBER, value_type="number"),
+    field("Penalty Amount", "Penalty Amount", NUMBER, value_type="number"),
+    field("Fine Amount", "Fine Amount", NUMBER, value_type="number"),
+]
+
+# Matched at the start of each block, i.e. right after its section header.
+CARGO_INVOICE_PATTERN = bounded(
+    r"\s*Invoice Sr No\s*:\s*(\d+)\s*"
+    r"Invoice Number(?>\s*:\s*(.*?)\s*Invoice Date)"
+    r"\s*:\s*(\S+)\s*"
+    r"Invoice Amount\s*:\s*(\S+)\s*"
+    r"Currency\s*:\s*(\S+)\s*"
+    r"Incoterms\s*:\s*(\S+)\s*"
+    r"Freight\s*:\s*(\S+)\s*"
+    r"Insurance\s*:\s*(\S+)\s*"
+    r"Supplier Name(?>\s*:\s*(.*?)\s*Supplier Address)"
+    r"(?>\s*:\s*(.*?)\s*Supplier Country)"
+    r"\s*:\s*(\S+)"
+)
+# Joined onto every item of the invoice (group 1 of the pattern is the key).
+CARGO_INVOICE_COLUMNS = [
+    Column("Invoice Number", "text", "item"),
+    Column("Invoice Date", "date", "item"),
+    Column("Invoice Amount", "number", "item"),
+    Column("Invoice Currency", "text", "item"),
+    Column("Incoterms", "text", "item"),
+    Column("Freight", "number", "item"),
+    Column("Insurance", "number", "item"),
+    Column("Supplier Name", "text", "item"),
+    Column("Supplier Address", "text", "item"),
+    Column("Supplier Country", "text", "item"),
+]
+CARGO_ITEM_PATTERN = bounded(
+    r"\s*Invoice Sr No\s*:\s*(\d+)\s*"
+    r"Item Sr No\s*:\s*(\d+)\s*"
+    r"CTH\s*:\s*(\S+)\s*"
+    r"Description(?>\s*:\s*(.*?)\s*Unit Price)"
+    r"\s*:\s*(\S+)\s*"
+    r"Quantity\s*:\s*(\S+)\s*"
+    r"UQC\s*:\s*(\S+)\s*"
+    r"Country of Origin(?>\s*:\s*(.*?)\s*Assessable Value)"
+    r"\s*:\s*(\d+\.?\d*)"
+)
+CARGO_ITEM_COLUMNS = [
+    Column("Invoice Sr No", "text", "item"),
+    Column("Item Sr No", "text", "item"),
+    Column("CTH", "text", "item"),
+    Column("Description", "text", "item"),
+    Column("Unit Price", "number", "item"),
+    Column("Quantity", "number", "item"),
+    Column("UQC", "text", "item"),
+    Column("Country of Origin", "text", "item"),
+    Column("Assessable Value", "number", "item"),
+]
+CARGO_BLANK_COLUMNS = []
+
+CARGO_SECTIONS = {
+    "invoice": "INVOICE DETAILS",
+    "item": "ITEM DETAILS",
+    "payment": "PAYMENT DETAILS",
+}
+
+CARGO_DOCUMENT_SCANNER = LabelScanner(CARGO_DOCUMENT_FIELDS)
+CARGO_PAYMENT_SCANNER = LabelScanner(CARGO_PAYMENT_FIELDS)
+
+# ===================== REGISTRY =====================
+REGISTRY = {
+    "courier": COURIER_DOCUMENT_FIELDS + COURIER_CHALLAN_COLUMNS + COURIER_ITEM_FIELDS + DUTY_COLUMNS,
+    "boe": BOE_DOCUMENT_FIELDS + BOE_CHALLAN_COLUMNS + BOE_FREIGHT_COLUMNS + BOE_ITEM_COLUMNS
+           + [BOE_MANUFACTURER_COLUMN] + DUTY_COLUMNS,
+    "cargo": CARGO_DOCUMENT_FIELDS + CARGO_PAYMENT_FIELDS + CARGO_INVOICE_COLUMNS + CARGO_ITEM_COLUMNS
+             + DUTY_COLUMNS,
+}
+# Labels printed in each type's first-page header (see classifier.py).
+DOC_TYPE_MARKERS = {
+    "courier": ("CBE-XIII Number",),
+    "boe": ("CBEXIV Number",),
+    "cargo": ("BILL OF ENTRY FOR HOME CONSUMPTION",),
+}
+# Constant empty columns appended to every row.
+BLANK_COLUMNS = {
+    "courier": COURIER_BLANK_COLUMNS,
+    "boe": BOE_BLANK_COLUMNS,
+    "cargo": CARGO_BLANK_COLUMNS,
+}
+
+# Patterns that are not per-label fields, profiled as a whole.
+RECORD_PATTERNS = {
+    "courier": [("document", "challan", COURIER_CHALLAN), ("item", "item blocks", COURIER_ITEM_BLOCK),
+                ("duty", "duty lines", DUTY_PATTERN)],
+    "boe": [("document", "challan", BOE_CHALLAN), ("document", "freight", BOE_FREIGHT),
+            ("item", "item records", BOE_ITEM_PATTERN), ("item", "manufacturer", BOE_MANUFACTURER),
+            ("duty", "duty lines", DUTY_PATTERN)],
+    "cargo": [("item", "invoice records", CARGO_INVOICE_PATTERN), ("item", "item records", CARGO_ITEM_PATTERN),
+              ("duty", "duty lines", DUTY_PATTERN)],
+}
+
+
+def column_types(doc_type):
+    return {spec.column: spec.value_type for spec in REGISTRY[doc_type]}
+
+
+def column_scopes(doc_type):
+    return {spec.column: spec.scope for spec in REGISTRY[doc_type]}
+
+
+def scope_columns(doc_type, scope):
+    return [spec.column for spec in REGISTRY[doc_type] if spec.scope == scope]
+
+
+def profile_fields(doc_type, pages, repeat=3):
+    # Times every label field on its own single-field scanner, and every
+    # record pattern on its own, over the same text; slowest first.
+    full_text = " ".join(p["content"] for p in pages if p.get("content"))
+    blocks = COURIER_ITEM_BLOCK.findall(full_text) if doc_type == "courier" else []
+    probes = []
+    for f in REGISTRY[doc_type]:
+        if not hasattr(f, "tail"):
+            continue
+        scanner = LabelScanner([f])
+        if f.scope == "item":
+            probes.append((f.scope, f.column, lambda s=scanner: [s.extract(b) for b in blocks]))
+        else:
+            probes.append((f.scope, f.column, lambda s=scanner: s.extract(full_text)))
+    for scope, name, pattern in RECORD_PATTERNS[doc_type]:
+        probes.append((scope, name, lambda p=pattern: p.findall(full_text)))
+
+    results = []
+    for scope, name, probe in probes:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            probe()
+            best = min(best, time.perf_counter() - start)
+        results.append({"scope": scope, "field": name, "ms": best * 1000})
+    return sorted(results, key=lambda r: r["ms"], reverse=True)
+
+
+def main():
+    from synthetic import GENERATORS
+
+    parser = argparse.ArgumentParser(description="Profile per-field extraction cost on a synthetic document.")
+    parser.add_argument("doc_type", choices=sorted(REGISTRY))
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--items-per-page", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = GENERATORS[args.doc_type](items=args.items, items_per_page=args.items_per_page)
+    results = profile_fields(args.doc_type, pages, args.repeat)
+    print(f"{'scope':<9} {'field':<34} {'ms':>9}")
+    for r in results:
+        print(f"{r['scope']:<9} {r['field']:<34} {r['ms']:>9.3f}")
+    print(f"{'':<9} {'total':<34} {sum(r['ms'] for r in results):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+# Read by gunicorn from the working directory (gunicorn newapi:app).
+
+
+def post_fork(server, worker):
+    # Each worker launches its own Chrome pool (selenium backend) as it
+    # starts, rather than on its first conversion.
+    from driver_pool import prelaunch
+    prelaunch()
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import queue
+import threading
+
+from deadline import CONVERSION_TIMEOUT, Cancelled, Deadline, running
+from stages import Recording, record_stages
+from workspace import SCRATCH_ROOT, remove_job_dir, remove_stale_dirs
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "32"))
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", "3600"))
+# Idle workers purge expired results this often, not only on submit.
+PURGE_INTERVAL = float(os.environ.get("JOB_PURGE_INTERVAL", "60"))
+STATUS_FILE = "job.json"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id, job_dir, func, args, download_name=None, timeout=CONVERSION_TIMEOUT):
+        self.id = job_id
+        self.dir = job_dir
+        self.func = func
+        self.args = args
+        self.download_name = download_name
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.stages = Recording()
+        # Runs from submission, so time spent queued counts against it.
+        self.deadline = Deadline(timeout)
+        # Set once nobody will ask for the result; the directory goes as
+        # soon as the job has finished.
+        self.discarded = False
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            # In-memory results (bytes) are sent by the request that waits
+            # for them; only a result file is shared through the status.
+            "result": self.result if isinstance(self.result, str) else None,
+            "download_name": self.download_name,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()},
+        }
+
+    def save(self):
+        # Status is mirrored into the job directory so a poll that lands on a
+        # different gunicorn worker can still answer.
+        path = os.path.join(self.dir, STATUS_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+
+def load_status(job_id):
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(os.path.join(SCRATCH_ROOT, job_id, STATUS_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class JobQueue:
+    def __init__(self, workers=JOB_WORKERS, max_queued=JOB_QUEUE_SIZE, ttl=JOB_RESULT_TTL, on_finish=None,
+                 timeout=CONVERSION_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.on_finish = on_finish
+        self.ttl = ttl
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._swept = 0.0
+
+    def _start(self):
+        # Worker threads start on first use rather than at import, so forked
+        # gunicorn workers and batch/CLI subprocesses don't inherit dead ones.
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, job_id, job_dir, func, *args, download_name=None):
+        self._start()
+        self.purge_expired()
+        job = Job(job_id, job_dir, func, args, download_name, self.timeout)
+        job.save()
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise QueueFull("Conversion queue is full, retry later.")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        job = self.get(job_id)
+        return job.to_dict() if job else load_status(job_id)
+
+    def cancel(self, job_id, detail=None):
+        # Cancels a queued or running job of this process; its worker gives
+        # up at the next cancellation point. False if there is none.
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.deadline.cancel("cancelled", detail)
+        return True
+
+    def discard(self, job):
+        # Drops a job whose result has been delivered (or will never be):
+        # it leaves the registry now and its directory as soon as it has
+        # finished, rather than after the TTL.
+        with self._lock:
+            self._jobs.pop(job.id, None)
+            job.discarded = True
+        if job._done.is_set():
+            remove_job_dir(job.dir)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.finished and now - job.finished > self.ttl]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            remove_job_dir(job.dir)
+        # Directories no registry knows about (left by a killed process)
+        # are swept once they are older than any live job's could be.
+        if now - self._swept > PURGE_INTERVAL:
+            self._swept = now
+            removed = remove_stale_dirs(self.ttl + self.timeout)
+            if removed:
+                print(f"♻️ Removed {removed} stale job director{'y' if removed == 1 else 'ies'}")
+
+    def _worker(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=PURGE_INTERVAL)
+            except queue.Empty:
+                self.purge_expired()
+                continue
+            job.status = "running"
+            job.started = time.time()
+            job.save()
+            try:
+                with record_stages() as job.stages, running(job.deadline):
+                    job.deadline.check()
+                    job.result = job.func(*job.args)
+                job.status = "done"
+            except Exception as e:
+                # A browser killed on cancellation fails with its own error;
+                # the deadline says why it was killed.
+                if isinstance(e, Cancelled) or job.deadline.reason:
+                    job.status = "timeout" if job.deadline.reason == "timeout" else "cancelled"
+                    job.error = job.deadline.message
+                else:
+                    job.status = "failed"
+                    job.error = str(e)
+                print(f"Error during job {job.id}: {job.error}")
+            job.finished = time.time()
+            job.save()
+            if self.on_finish:
+                try:
+                    self.on_finish(job)
+                except Exception as e:
+                    print(f"⚠️ on_finish failed for job {job.id}: {e}")
+            job._done.set()
+            if job.discarded:
+                remove_job_dir(job.dir)
@@ -0,0 +1,127 @@
+import os
+import re
+from collections import namedtuple
+
+# Bounded-match mode: every lazy ".*?" in the field and record patterns may
+# span at most MATCH_WINDOW characters, so a label whose
+# terminator is missing (a truncated or scanned page) fails after a short
+# scan instead of reading the rest of the document from every occurrence.
+# 0 restores unbounded values.
+MATCH_WINDOW = int(os.environ.get("MATCH_WINDOW", "10000"))
+
+
+def bounded(pattern, flags=re.DOTALL, window=MATCH_WINDOW):
+    # Compiles `pattern` with each unescaped ".*?" capped at `window` characters.
+    if window:
+        pattern = re.sub(r"(?<!\\)\.\*\?", f".{{0,{window}}}?", pattern)
+    return re.compile(pattern, flags)
+
+
+# A field is read from the first occurrence of `label` whose `tail` pattern
+# matches right after it; group 1 of the tail is the value. With an `anchor`
+# (label, tail) only occurrences after the first matching anchor count, which
+# mirrors patterns like r"SUPPLIER DETAILS\s.*?Name\s*:\s*(.*?)\s+Address".
+# `until` names the literal a lazy tail runs up to: once it no longer occurs
+# in the rest of the text no later occurrence can match either, so the field
+# is given up instead of rescanning the document from every occurrence.
+# `default` overrides the extract() default for this field; `value_type` and
+# `scope` describe the column for exporters and profiling.
+Field = namedtuple("Field", "column label tail anchor until default value_type scope")
+
+
+def field(column, label, tail, anchor=None, anchor_tail=r"", until=None, default=None,
+          value_type="text", scope="document"):
+    return Field(column, label, bounded(tail),
+                 (anchor, bounded(anchor_tail)) if anchor else None,
+                 until, default, value_type, scope)
+
+
+class LabelScanner:
+    """Extracts a fixed set of fields in one left-to-right pass over the text.
+
+    All labels are compiled into a single alternation, so the document is
+    read once no matter how many fields there are. Each label occurrence only
+    runs the short tail pattern of the fields that use it, and the scan stops
+    as soon as every field has its value - a document whose labels all sit on
+    page 1 is never read past it.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        labels = []
+        self._uses = {}
+        for i, f in enumerate(self.fields):
+            labels.append(f.label)
+            self._uses.setdefault(f.label, []).append((i, False))
+            if f.anchor:
+                labels.append(f.anchor[0])
+                self._uses.setdefault(f.anchor[0], []).append((i, True))
+        labels = list(dict.fromkeys(labels))
+        longest_first = sorted(labels, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(l) for l in longest_first))
+        # A label that is a prefix of a longer one occurs wherever the longer one does.
+        self._prefixes = {l: [p for p in labels if p != l and l.startswith(p)] for l in labels}
+
+    def occurrences(self, text):
+        # Resume one character after each hit (not after the whole label) so
+        # overlapping occurrences are still reported.
+        m = self._pattern.search(text)
+        while m:
+            label, pos = m.group(), m.start()
+            yield label, pos
+            for prefix in self._prefixes[label]:
+                yield prefix, pos
+            m = self._pattern.search(text, pos + 1)
+
+    def scan(self, text, values=None):
+        # Fills the unresolved (None) entries of `values` from `text`. A field
+        # given up on (no match, or its `until` literal is gone) stays None.
+        values = [None] * len(self.fields) if values is None else values
+        done = [v is not None for v in values]
+        # Where each field may start matching: 0 without an anchor, None until
+        # its anchor has been seen, then the end of the anchor match.
+        starts = [None if f.anchor else 0 for f in self.fields]
+        # Next occurrence of each field's `until`, found once per field
+        # rather than once per label occurrence.
+        untils = [-1] * len(self.fields)
+        remaining = done.count(False)
+        if not remaining:
+            return values
+
+        for label, pos in self.occurrences(text):
+            for i, is_anchor in self._uses[label]:
+                if done[i]:
+                    continue
+                f = self.fields[i]
+                if is_anchor:
+                    if starts[i] is None:
+                        m = f.anchor[1].match(text, pos + len(label))
+                        if m:
+                            starts[i] = m.end()
+                    continue
+                if starts[i] is None or pos < starts[i]:
+                    continue
+                if f.until:
+                    if untils[i] < pos + len(label):
+                        untils[i] = text.find(f.until, pos + len(label))
+                    if untils[i] == -1:
+                        done[i] = True
+                        remaining -= 1
+                        continue
+                m = f.tail.match(text, pos + len(label))
+                if m:
+                    values[i] = m.group(1).strip()
+                    done[i] = True
+                    remaining -= 1
+            if not remaining:
+                break
+        return values
+
+    def extract(self, text, default="Not found", fallback=None):
+        # `text` may be a prefix of `fallback` (e.g. the first pages of the
+        # document); fields it does not resolve are looked up in `fallback`.
+        values = self.scan(text)
+        if fallback is not None and fallback is not text and None in values:
+            values = self.scan(fallback, values)
+        return {f.column: v if v is not None else default if f.default is None else f.default
+                for f, v in zip(self.fields, values)}
@@ -0,0 +1,115 @@
+import threading
+
+# Process-local counters and histograms in the Prometheus text format, written
+# by hand so the service needs no client library. Each gunicorn worker keeps
+# its own, as prometheus_client does outside multiprocess mode.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRICS = {
+    "pdf_requests_total": ("counter", "HTTP requests by endpoint and status."),
+    "pdf_request_duration_seconds": ("histogram", "HTTP request latency by endpoint."),
+    "pdf_bytes_in_total": ("counter", "Request body bytes received, by endpoint."),
+    "pdf_bytes_out_total": ("counter", "Response body bytes sent, by endpoint."),
+    "pdf_conversions_total": ("counter", "Finished conversions by document type and outcome."),
+    "pdf_conversion_failures_total": ("counter", "Failed conversions by the stage that raised."),
+    "pdf_conversion_timeouts_total": ("counter", "Conversions stopped by their deadline, by the stage they were in."),
+    "pdf_stage_duration_seconds": ("histogram", "Time spent in each conversion stage."),
+    "pdf_cache_requests_total": ("counter", "Page and workbook cache lookups by result."),
+    "pdf_cache_evictions_total": ("counter", "Result cache entries evicted to stay under its size cap."),
+    "pdf_job_queue_depth": ("gauge", "Jobs waiting for a worker."),
+}
+
+_lock = threading.Lock()
+_samples = {}  # (name, labels) -> value, or [bucket counts..., sum, count] for histograms
+_gauges = {}   # name -> callable read at scrape time
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _samples[key] = _samples.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    with _lock:
+        counts = _samples.get(key)
+        if counts is None:
+            counts = _samples[key] = [0] * len(BUCKETS) + [0.0, 0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                counts[i] += 1
+        counts[-2] += seconds
+        counts[-1] += 1
+
+
+def gauge(name, func):
+    _gauges[name] = func
+
+
+def observe_stages(times):
+    # A stage recording (see stages.record_stages) into the stage histogram.
+    for name, seconds in times.items():
+        observe("pdf_stage_duration_seconds", seconds, stage=name)
+
+
+# ===================== EXPOSITION =====================
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    with _lock:
+        samples = {key: list(value) if isinstance(value, list) else value for key, value in _samples.items()}
+    lines = []
+    for name, (kind, text) in METRICS.items():
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "gauge":
+            if name in _gauges:
+                lines.append(f"{name} {_number(_gauges[name]())}")
+            continue
+        for (sample_name, pairs), value in sorted(samples.items()):
+            if sample_name != name:
+                continue
+            if kind == "counter":
+                lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                continue
+            for bound, count in zip(BUCKETS, value):
+                lines.append(f"{name}_bucket{_labels(pairs + (('le', repr(bound)),))} {count}")
+            lines.append(f"{name}_bucket{_labels(pairs + (('le', '+Inf'),))} {value[-1]}")
+            lines.append(f"{name}_sum{_labels(pairs)} {_number(value[-2])}")
+            lines.append(f"{name}_count{_labels(pairs)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+# ===================== REQUEST LOG =====================
+def logfmt(fields):
+    # key=value pairs in the given order, quoting values with spaces or
+    # quotes; None values are left out.
+    parts = []
+    for key, value in fields.items():
+        if value is None:
+            continue
+        if isinstance(value, float):
+            value = f"{value:.1f}"
+        value = str(value)
+        if not value or any(c in value for c in " \"="):
+            value = '"' + value.replace("\\", "\\\\").replace("\"", "\\\"") + '"'
+        parts.append(f"{key}={value}")
+    return " ".join(parts)
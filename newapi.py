@@ -1,345 +1,669 @@
-from flask import Flask, request, jsonify, send_file, render_template
-import os, re, json, tempfile, time
-import pandas as pd
+from flask import Flask, Request, Response, g, request, jsonify, send_file, render_template
+import io, os, shutil, time, select, socket
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from converter import convert_pdf, DEFAULT_BACKEND
+from driver_pool import prelaunch
+from cache import ResultCache, file_sha256, make_key
+from field_specs import (
+    DUTY_PATTERN, duty_rows, duty_table, COURIER_SECTIONS, BOE_SECTIONS,
+    COURIER_DOCUMENT_SCANNER, COURIER_ITEM_SCANNER, COURIER_ITEM_BLOCK, COURIER_CHALLAN,
+    COURIER_CHALLAN_VALUES, COURIER_CHALLAN_COLUMNS, COURIER_BLANK_COLUMNS,
+    BOE_DOCUMENT_SCANNER, BOE_CHALLAN, BOE_CHALLAN_VALUES, BOE_CHALLAN_COLUMNS, BOE_FREIGHT,
+    BOE_FREIGHT_VALUES, BOE_FREIGHT_COLUMNS, BOE_ITEM_PATTERN, BOE_ITEM_COLUMNS, BOE_MANUFACTURER,
+    BOE_MANUFACTURER_COLUMN, BOE_BLANK_COLUMNS, CARGO_SECTIONS, CARGO_DOCUMENT_SCANNER,
+    CARGO_PAYMENT_SCANNER, CARGO_INVOICE_PATTERN, CARGO_INVOICE_COLUMNS, CARGO_ITEM_PATTERN, CARGO_ITEM_COLUMNS,
+)
+from page_index import PageIndex
+from classifier import AUTO, detect_doc_type
+from stages import note, stage
+from spool import MAX_REQUEST_MB, Spool
+from jobs import JobQueue, QueueFull
+from batch import run_batch, summary_headers, iter_batch_workbook, iter_batch_zip
+from xlsx_stream import XLSX_MIMETYPE
+import storage
+import metrics
+from exporters import DEFAULT_FORMAT, export_bytes, export_rows, extension, format_error, iter_export, mimetype
+
+class UploadRequest(Request):
+    # Uploaded files are streamed straight into this request's job
+    # directory as the body is parsed, hashed on the way (see spool.py).
+    spool = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.spool is None:
+            self.spool = Spool()
+        return self.spool.open()
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+# Larger bodies are refused with 413 before they are read.
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_MB * 1024 * 1024
+
+# Bump whenever parse_* output changes so cached workbooks are not reused.
+PARSER_VERSION = "3"
+result_cache = ResultCache()
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
-# ===================== COURIER PDF PROCESSING (from pp2api.py) =====================
-def extract(pattern, text, default="Not Found"):
-    match = re.search(pattern, text, re.DOTALL)
-    return match.group(1).strip() if match else default
-
-def get_between(start, end, text):
-    pattern = rf"{re.escape(start)}\s*:\s*(.*?)\s*{re.escape(end)}"
-    match = re.search(pattern, text, re.DOTALL)
-    return match.group(1).strip() if match else "Not Found"
+# ===================== CONVERSION (with page cache) =====================
+def load_pages(pdf_path, backend=None, digest=None):
+    # digest: the upload's sha256 when already known; the PDF is only
+    # hashed from disk without it.
+    with stage("load"):
+        if not result_cache.enabled:
+            return convert_pdf(pdf_path, backend)
+        key = make_key(digest or file_sha256(pdf_path), "pages", backend or DEFAULT_BACKEND)
+        pages = result_cache.load_json(key)
+        cache_result("pages", pages is not None)
+        if pages is None:
+            pages = convert_pdf(pdf_path, backend)
+            result_cache.store_json(key, pages)
+        return pages
+
+def cache_result(cache, hit):
+    metrics.inc("pdf_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+    note(**{f"{cache}_cache": "hit" if hit else "miss"})
+
+def store_rows(doc_type, rows, pdf_path, digest=None):
+    # Optional DATABASE_URL sink; a database error never fails the conversion.
+    if not storage.enabled():
+        return
+    try:
+        with stage("store"):
+            storage.save_document(doc_type, rows, digest or file_sha256(pdf_path),
+                                  os.path.basename(pdf_path), PARSER_VERSION)
+    except Exception as e:
+        print(f"⚠️ Could not store {doc_type} rows for {pdf_path}: {e}")
 
-def process_courier_pdf(pdf_path):
+# ===================== COURIER PDF PROCESSING (from pp2api.py) =====================
+def parse_courier_pages(raw_data):
+    with stage("join"):
+        index = PageIndex([entry["content"] for entry in raw_data if entry.get("content")], COURIER_SECTIONS)
+        item_text = index.text_from("item")
+
+    # Header fields come from the pages before the items, the challan from
+    # its own page on; only unresolved header fields fall back to the rest.
+    with stage("metadata"):
+        metadata = COURIER_DOCUMENT_SCANNER.extract(index.text_until("item"), fallback=index.full_text)
+        challan_match = COURIER_CHALLAN.search(index.text_from("challan"))
+        values = COURIER_CHALLAN_VALUES.search(challan_match.group(1)) if challan_match else None
+        for column, value in zip(COURIER_CHALLAN_COLUMNS, values.groups() if values else ["Not Found"] * 3):
+            metadata[column.column] = value
+
+    with stage("items"):
+        items = [COURIER_ITEM_SCANNER.extract(block) for block in COURIER_ITEM_BLOCK.findall(item_text)]
+    with stage("duties"):
+        duty_records = duty_rows(DUTY_PATTERN.findall(item_text))
+
+    with stage("assembly"):
+        blanks = dict.fromkeys(COURIER_BLANK_COLUMNS, "")
+        final_data = []
+        row_count = min(len(items), len(duty_records))
+        for i in range(row_count):
+            final_data.append({**metadata, **items[i], **duty_records[i], **blanks})
+    return final_data
+
+def process_courier_pdf(pdf_path, backend=None, output_format=DEFAULT_FORMAT, pages=None, digest=None):
     pdf_name_only = os.path.splitext(os.path.basename(pdf_path))[0]
     download_folder = os.path.dirname(pdf_path)
-    json_path = os.path.join(download_folder, "converted.json")
-
-    options = Options()
-    options.add_experimental_option("prefs", {
-        "download.default_directory": download_folder,
-        "download.prompt_for_download": False,
-        "directory_upgrade": True
-    })
-    driver = Chrome(options=options)
-    driver.get("https://ilovepdf4.com/pdf-to-json/")
-    wait = WebDriverWait(driver, 20)
 
-    try:
-        iframe = wait.until(EC.presence_of_element_located((By.TAG_NAME, "iframe")))
-        driver.switch_to.frame(iframe)
-    except:
-        pass
-
-    upload_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
-    upload_input.send_keys(pdf_path)
-
-    convert_btn = wait.until(EC.element_to_be_clickable((By.ID, "convertButton")))
-    convert_btn.click()
-
-    for _ in range(30):
-        if os.path.exists(json_path):
-            break
-        time.sleep(1)
-
-    driver.quit()
-
-    if not os.path.exists(json_path):
-        raise FileNotFoundError("Converted JSON file not found.")
-
-    with open(json_path, "r", encoding="utf-8") as f:
-        raw_data = json.load(f)
-    os.remove(json_path)
-
-    full_text = " ".join([entry["content"] for entry in raw_data if entry.get("content")])
-
-    challan_match = re.search(r"TR-6 Challan Number\s+Total Amount\s+Challan Date\s+(.*?)\s+DECLARATION", full_text, re.DOTALL)
-    tr6_number = total_amt = challan_date = "Not Found"
-    if challan_match:
-        values = re.search(r"(\d+)\s+(\d+)\s+(\d{2}/\d{2}/\d{4})", challan_match.group(1))
-        if values:
-            tr6_number, total_amt, challan_date = values.groups()
-
-    metadata = {
-        "CBE Number": extract(r"CBE-XIII Number\s*([A-Z0-9_/-]+)", full_text),
-        "HAWB Number": extract(r"HAWB Number\s*:\s*(\S+)", full_text),
-        "Name of Consignor": get_between("Name of Consignor", "Address of Consignor", full_text),
-        "Address of Consignor": get_between("Address of Consignor", "Name of Consignee", full_text),
-        "Name of Consignee": get_between("Name of Consignee", "Address of Consignee", full_text),
-        "Address of Consignee": get_between("Address of Consignee", "Import Export Code", full_text),
-        "Interest Amount": extract(r"Interest Amount\s*:\s*(\S+)", full_text),
-        "TR-6 Challan Number": tr6_number,
-        "Total Amount": total_amt,
-        "Challan Date": challan_date
-    }
-
-    item_blocks = re.findall(r"ITEM\s*:(.*?)NOTIFICATION USED FOR THE ITEM", full_text, re.DOTALL)
-    items = []
-    for block in item_blocks:
-        item = {
-            "Country of Origin": extract(r"Country of Origin\s*:\s*(.*?)\s", block),
-            "Description of Goods": get_between("Description of Goods", "Name of Manufacturer", block),
-            "Quantity": extract(r"Quantity\s*:\s*(\d+)", block),
-            "Invoice Value": extract(r"Invoice Value\s*:\s*(\d+\.?\d*)", block),
-            "Unit Price": extract(r"Unit Price\s*:\s*(\d+\.?\d*)", block),
-            "Currency": extract(r"Currency of Unit Price\s*:\s*(\w+)", block),
-            "Rate of Exchange": extract(r"Rate of Exchange\s*:\s*(\d+\.?\d*)", block),
-            "Assessable Value": extract(r"Assessable Value\s*:\s*(\d+\.?\d*)", block),
-            "Insurance": extract(r"Insurance\s*:\s*(\d+\.?\d*)", block),
-            "Freight": extract(r"Freight\s*:\s*(\d+\.?\d*)", block),
-            "Name of Manufacturer": get_between("Name of Manufacturer", "Address of Manufacturer", block)
-        }
-        items.append(item)
-
-    duty_pattern = re.compile(
-        r"(BCD|AIDC|SW SRCHRG|IGST|CMPNSTRY)\s+"
-        r"(\d+(?:\.\d+)?)\s+"
-        r"(\d+(?:\.\d+)?)\s+"
-        r"(\d+(?:\.\d+)?)\s+"
-        r"(\d+(?:\.\d+)?)",
-        re.IGNORECASE
-    )
-    matches = duty_pattern.findall(full_text)
-
-    duty_records = []
-    for i in range(0, len(matches), 5):
-        group = matches[i:i+5]
-        row = {}
-        for duty, ad, sr, fg, amt in group:
-            key = duty.lower().replace(" ", "_")
-            row[f"{key}_ad_valorem"] = float(ad)
-            row[f"{key}_specific_rate"] = float(sr)
-            row[f"{key}_duty_forgone"] = float(fg)
-            row[f"{key}_duty_amount"] = float(amt)
-        duty_records.append(row)
-
-    final_data = []
-    row_count = min(len(items), len(duty_records))
-    for i in range(row_count):
-        row = {
-            **metadata,
-            **items[i],
-            **duty_records[i],
-            "BE Type": "",
-            "CB Name": "",
-            "Total freight": "",
-            "Total insurance": "",
-            "Incoterms": "",
-            "Penalty Amount": "",
-            "Fine Amount": ""
-        }
-        final_data.append(row)
-
-    df = pd.DataFrame(final_data)
-    output_file = os.path.join(download_folder, f"{pdf_name_only}.xlsx")
-    df.to_excel(output_file, index=False)
+    raw_data = pages if pages is not None else load_pages(pdf_path, backend, digest)
+    final_data = parse_courier_pages(raw_data)
+    store_rows("courier", final_data, pdf_path, digest)
+    with stage("export"):
+        output_file = export_rows(final_data, "courier", output_format, os.path.join(download_folder, pdf_name_only))
     return output_file, pdf_name_only
 
 # ===================== BOE PDF PROCESSING (from ttapi.py) =====================
+def extract_boe_metadata(index):
+    # Header labels sit on the pages up to the supplier and first item
+    # sections; the challan table is searched from its own page on.
+    metadata = BOE_DOCUMENT_SCANNER.extract(index.text_until("supplier", "item"), fallback=index.full_text)
+    challan_match = BOE_CHALLAN.search(index.text_from("challan"))
+    values = BOE_CHALLAN_VALUES.search(challan_match.group(1)) if challan_match else None
+    for column, value in zip(BOE_CHALLAN_COLUMNS, values.groups()[1:] if values else ["Not found"] * 3):
+        metadata[column.column] = value
+    return metadata
+
+def parse_boe_pages(data):
+    with stage("join"):
+        index = PageIndex([entry["content"] for entry in data], BOE_SECTIONS)
+        item_text = index.text_from("item")
+        manufacturer_text = index.text_from("manufacturer")
+
+    with stage("metadata"):
+        metadata = extract_boe_metadata(index)
+        freight_page = index.first("freight")
+        freight_match = BOE_FREIGHT.search(index.texts[freight_page]) if freight_page is not None else None
+        if freight_match:
+            values = BOE_FREIGHT_VALUES.findall(freight_match.group(1).strip())
+            if values:
+                metadata.update(zip((c.column for c in BOE_FREIGHT_COLUMNS), values[0]))
+
+    with stage("items"):
+        records = BOE_ITEM_PATTERN.findall(item_text)
+        manufacturers = BOE_MANUFACTURER.findall(manufacturer_text)
+    with stage("duties"):
+        matches = []
+        for text in index.texts:
+            matches.extend(DUTY_PATTERN.findall(text))
+    with stage("assembly"):
+        return join_boe_rows(metadata, records, manufacturers, matches)
+
+def join_boe_rows(metadata, records, manufacturers, matches):
+    # Built column by column and transposed once: metadata is broadcast,
+    # duty lines pivoted into one float column per duty type and measure.
+    duty_columns, duty_values = duty_table(matches)
+    row_count = min(len(records), len(duty_values))
+    records = records[:row_count]
+    manufacturers = [m.strip() for m in manufacturers[:row_count]]
+
+    columns = {column: [value] * row_count for column, value in metadata.items()}
+    for k, column in enumerate(BOE_ITEM_COLUMNS):
+        columns[column.column] = [record[k].strip() for record in records]
+    columns[BOE_MANUFACTURER_COLUMN.column] = manufacturers + [""] * (row_count - len(manufacturers))
+    columns.update(zip(duty_columns, duty_values[:row_count].T.tolist()))
+    columns.update((column, [""] * row_count) for column in BOE_BLANK_COLUMNS)
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+def process_boe_pdf(pdf_path, backend=None, output_format=DEFAULT_FORMAT, pages=None, digest=None):
+    pdf_name_only = os.path.splitext(os.path.basename(pdf_path))[0]
+    download_folder = os.path.dirname(pdf_path)
 
-def extract(pattern, text, default="Not found"):
-    match = re.search(pattern, text, re.DOTALL)
-    return match.group(1).strip() if match else default
-
-def process_boe_pdf(pdf_path):
+    data = pages if pages is not None else load_pages(pdf_path, backend, digest)
+    final_data = parse_boe_pages(data)
+    store_rows("boe", final_data, pdf_path, digest)
+    with stage("export"):
+        return export_rows(final_data, "boe", output_format,
+                           os.path.join(download_folder, f"{pdf_name_only}_converted"))
+
+
+# ===================== CARGO BOE PROCESSING =====================
+def parse_cargo_pages(data):
+    # Items may straddle pages, so item blocks are cut from the joined item
+    # pages; each block runs from one section header to the next, so a
+    # record never reads into the next one.
+    with stage("join"):
+        index = PageIndex([entry["content"] for entry in data], CARGO_SECTIONS)
+        invoice_blocks = index.text_until("item").split(CARGO_SECTIONS["invoice"])[1:]
+        item_blocks = index.text_from("item").split(CARGO_SECTIONS["item"])[1:]
+
+    # Invoices sit before the first item page.
+    with stage("metadata"):
+        metadata = CARGO_DOCUMENT_SCANNER.extract(index.text_until("invoice"), fallback=index.full_text)
+        metadata.update(CARGO_PAYMENT_SCANNER.extract(index.text_from("payment")))
+        invoices = {}
+        for block in invoice_blocks:
+            m = CARGO_INVOICE_PATTERN.match(block)
+            if m:
+                invoices.setdefault(m.group(1), m.groups()[1:])
+
+    # Each block's duty lines belong to its item.
+    with stage("items"):
+        records, ends = [], []
+        for k, block in enumerate(item_blocks):
+            m = CARGO_ITEM_PATTERN.match(block)
+            if m:
+                records.append(m.groups())
+                ends.append((k, m.end()))
+    with stage("duties"):
+        matches, owners = [], []
+        for row, (k, end) in enumerate(ends):
+            duties = DUTY_PATTERN.findall(item_blocks[k], end)
+            owners.extend([row] * len(duties))
+            matches.extend(duties)
+    with stage("assembly"):
+        return join_cargo_rows(metadata, invoices, records, matches, owners)
+
+def join_cargo_rows(metadata, invoices, records, matches, owners):
+    # Column by column like join_boe_rows; invoice columns are looked up by
+    # each item's Invoice Sr No.
+    row_count = len(records)
+    duty_columns, duty_values = duty_table(matches, owners, row_count)
+    unknown = ("Not found",) * len(CARGO_INVOICE_COLUMNS)
+    item_invoices = [invoices.get(record[0], unknown) for record in records]
+
+    columns = {column: [value] * row_count for column, value in metadata.items()}
+    for k, column in enumerate(CARGO_INVOICE_COLUMNS):
+        columns[column.column] = [invoice[k].strip() for invoice in item_invoices]
+    for k, column in enumerate(CARGO_ITEM_COLUMNS):
+        columns[column.column] = [record[k].strip() for record in records]
+    columns.update(zip(duty_columns, duty_values.T.tolist()))
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+def process_cargo_pdf(pdf_path, backend=None, output_format=DEFAULT_FORMAT, pages=None, digest=None):
     pdf_name_only = os.path.splitext(os.path.basename(pdf_path))[0]
     download_folder = os.path.dirname(pdf_path)
-    json_filename = "converted.json"
-    json_path = os.path.join(download_folder, json_filename)
-
-    options = Options()
-    options.add_experimental_option("prefs", {
-        "download.default_directory": download_folder,
-        "download.prompt_for_download": False,
-        "directory_upgrade": True
-    })
-    driver = Chrome(options=options)
-    driver.get("https://ilovepdf4.com/pdf-to-json/")
-    wait = WebDriverWait(driver, 20)
-    try:
-        iframe = wait.until(EC.presence_of_element_located((By.TAG_NAME, "iframe")))
-        driver.switch_to.frame(iframe)
-    except:
-        pass
-
-    upload_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
-    upload_input.send_keys(pdf_path)
-    convert_btn = wait.until(EC.element_to_be_clickable((By.ID, "convertButton")))
-    convert_btn.click()
-
-    for _ in range(30):
-        if os.path.exists(json_path):
-            break
-        time.sleep(1)
-
-    driver.quit()
-    if not os.path.exists(json_path):
-        raise FileNotFoundError("Converted JSON not found.")
-
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    os.remove(json_path)
-
-    full_text = " ".join([entry["content"] for entry in data])
-    challan_block = extract(r"Challan Date\s*(.*?)\s*DECLARATION", full_text)
-    challan_values = re.search(r"(\d+)\s+(\d+)\s+(\d+)\s+(\d{2}/\d{2}/\d{4})", challan_block)
-    tr6_challan_number = challan_values.group(2) if challan_values else "Not found"
-    total_amount = challan_values.group(3) if challan_values else "Not found"
-    challan_date = challan_values.group(4) if challan_values else "Not found"
-
-    metadata = {
-        "CBEXIV Number": extract(r"CBEXIV Number\s*:\s*(.*?)\s", full_text),
-        "Importer Name": extract(r"Import Export Branch Code\s*:\s*.*?Name\s*:\s*(.*?)\s+Address", full_text),
-        "Importer Address": extract(r"Import Export Branch Code\s*:\s*.*?Address\s*:\s*(.*?)\s*Category Of Importer", full_text),
-        "Supplier Name": extract(r"SUPPLIER DETAILS\s.*?Name\s*:\s*(.*?)\s+Address", full_text),
-        "Supplier Address": extract(r"SUPPLIER DETAILS\s.*?Address\s*:\s*(.*?)\s*IF SUPPLIER IS NOT THE SELLER", full_text),
-        "BOE Date": extract(r"BOE Date\s*:\s*(.*?)\s", full_text),
-        "Country of Origin": extract(r"Country of Origin\s*:\s*(.*?)\s", full_text),
-        "Country of Consignment": extract(r"Country of Consignment\s*:\s*(.*?)\s", full_text),
-        "House Airway Bill (HAWB) Number": extract(r"House Airway Bill \(HAWB\) Number\s*:\s*(.*?)\s", full_text),
-        "Master Airway Bill (MAWB) Number": extract(r"Master Airway Bill \(MAWB\) Number\s*:\s*(.*?)\s", full_text),
-        "Interest Amount": extract(r"Interest Amount\s*:\s*(.*?)\s", full_text),
-        "Invoice Number": extract(r"Invoice Number\s*:\s*(.*?)\s", full_text),
-        "Date of Invoice": extract(r"Date of Invoice\s*:\s*(.*?)\s", full_text),
-        "Invoice Value": extract(r"Invoice Value\s*:\s*(.*?)\s", full_text),
-        "Currency": extract(r"Currency\s*:\s*(USD|INR|EUR|[A-Z]{3})", full_text),
-        "TR-6 Challan Number": tr6_challan_number,
-        "Total Amount": total_amount,
-        "Challan Date": challan_date
-    }
 
-    freight_content = next((entry["content"] for entry in data if "Currency Freight" in entry["content"]), "")
-    freight_match = re.search(r"Currency Freight\s*:\s*(.*?)\s*Loading", freight_content, re.DOTALL)
-    if freight_match:
-        section = freight_match.group(1).strip()
-        values = re.findall(r"(\d+\.?\d*)\s+(\d+\.?\d*)\s+([A-Z]{3})\s+Insurance\s*:\s*(\d+\.?\d*)\s+(\d+\.?\d*)\s+([A-Z]{3})", section)
-        if values:
-            freight_rate, freight_amount, freight_currency, insurance_rate, insurance_amount, insurance_currency = values[0]
-            metadata.update({
-                "freight_rate": freight_rate,
-                "freight_amount": freight_amount,
-                "freight_currency": freight_currency,
-                "insurance_rate": insurance_rate,
-                "insurance_amount": insurance_amount,
-                "insurance_currency": insurance_currency
-            })
-
-    item_pattern = re.findall(
-        r"Item Description\s*:\s*(.*?)\s*General Description\s*:\s*"
-        r"Currency for Unit Price\s*:\s*(.*?)\s*"
-        r"Unit Price\s*:\s*(.*?)\s*"
-        r"Unit of Measure\s*:\s*(.*?)\s*"
-        r"Quantity\s*:\s*(.*?)\s*"
-        r"Rate Of Exchange\s*:\s*(.*?)\s*Accessories"
-        r".*?Assessable Value\s*:\s*(\d+\.?\d*)",
-        full_text, re.DOTALL
-    )
-    df_items = pd.DataFrame(item_pattern, columns=[
-        "Item Description", "Currency for Unit Price", "Unit Price",
-        "Unit of Measure", "Quantity", "Rate Of Exchange", "Assessable Value"
-    ])
-    for col in df_items.select_dtypes(include=['object']).columns:
-        df_items[col] = df_items[col].str.strip()
-
-    manufacturer_matches = re.findall(r"Name of Manufacturer\s*:\s*(.*?)\s*Brand\s*:", full_text, re.DOTALL)
-    manufacturer_column = [m.strip() for m in manufacturer_matches[:len(df_items)]]
-    df_items["Name of Manufacturer"] = manufacturer_column + [""] * (len(df_items) - len(manufacturer_column))
-
-    duty_pattern = re.compile(
-        r"(BCD|AIDC|SW SRCHRG|IGST|CMPNSTRY)\s+"
-        r"(\d+(?:\.\d+)?)\s+"
-        r"(\d+(?:\.\d+)?)\s+"
-        r"(\d+(?:\.\d+)?)\s+"
-        r"(\d+(?:\.\d+)?)", re.IGNORECASE
-    )
-    matches = []
-    for entry in data:
-        matches.extend(duty_pattern.findall(entry["content"]))
-
-    duty_records = []
-    for i in range(0, len(matches), 5):
-        group = matches[i:i+5]
-        row = {}
-        for duty, ad, sr, fg, amt in group:
-            key = duty.lower().replace(" ", "_")
-            row[f"{key}_ad_valorem"] = float(ad)
-            row[f"{key}_specific_rate"] = float(sr)
-            row[f"{key}_duty_forgone"] = float(fg)
-            row[f"{key}_duty_amount"] = float(amt)
-        duty_records.append(row)
-
-    df_duties = pd.DataFrame(duty_records)
-
-    final_data = []
-    row_count = min(len(df_items), len(df_duties))
-    for i in range(row_count):
-        combined = {
-            **metadata,
-            **df_items.iloc[i].to_dict(),
-            **df_duties.iloc[i].to_dict(),
-            "BE Type": "",
-            "CB Name": "",
-            "Total freight": "",
-            "Total insurance": "",
-            "Incoterms": "",
-            "penalty_amount": "",
-            "fine_amount": ""
-        }
-        final_data.append(combined)
-
-    output_path = os.path.join(download_folder, f"{pdf_name_only}_converted.xlsx")
-    pd.DataFrame(final_data).to_excel(output_path, index=False)
+    data = pages if pages is not None else load_pages(pdf_path, backend, digest)
+    final_data = parse_cargo_pages(data)
+    store_rows("cargo", final_data, pdf_path, digest)
+    with stage("export"):
+        return export_rows(final_data, "cargo", output_format,
+                           os.path.join(download_folder, f"{pdf_name_only}_converted"))
+
+# ===================== JOB QUEUE =====================
+PROCESSORS = {
+    "courier": lambda pdf_path, backend=None, output_format=DEFAULT_FORMAT, pages=None, digest=None:
+        process_courier_pdf(pdf_path, backend, output_format, pages, digest)[0],
+    "boe": process_boe_pdf,
+    "cargo": process_cargo_pdf,
+}
+
+def resolve_doc_type(doc_type, pages):
+    # "auto" takes the first page's type. An explicit type is trusted unless
+    # the first page clearly belongs to another one, which would otherwise
+    # parse into an empty sheet.
+    with stage("classify"):
+        detected = detect_doc_type(pages)
+        note(doc_type=detected or doc_type)
+        if doc_type == AUTO:
+            if detected is None:
+                raise ValueError("Could not detect the document type; pass docType explicitly")
+            return detected
+        if detected and detected != doc_type:
+            print(f"⚠️ Requested {doc_type} but the first page is a {detected} document; parsing it as {detected}")
+            return detected
+        return doc_type
+
+def workbook_key(digest, doc_type, backend=None, output_format=DEFAULT_FORMAT):
+    return make_key(digest, doc_type, backend or DEFAULT_BACKEND, PARSER_VERSION, output_format)
+
+def cached_workbook(digest, doc_type, backend=None, output_format=DEFAULT_FORMAT):
+    return result_cache.get_path(workbook_key(digest, doc_type, backend, output_format), extension(output_format))
+
+def convert_document(doc_type, pdf_path, backend=None, digest=None, output_format=DEFAULT_FORMAT):
+    pages = load_pages(pdf_path, backend, digest)
+    output_path = PROCESSORS[resolve_doc_type(doc_type, pages)](pdf_path, backend, output_format, pages, digest)
+    if digest:
+        result_cache.store_file(workbook_key(digest, doc_type, backend, output_format),
+                                extension(output_format), output_path)
     return output_path
 
+def convert_document_cached(doc_type, pdf_path, backend=None, digest=None, output_format=DEFAULT_FORMAT):
+    digest = digest or file_sha256(pdf_path)
+    cached = cached_workbook(digest, doc_type, backend, output_format)
+    cache_result("workbook", bool(cached))
+    if cached:
+        # Copy out of the cache: the job result may be fetched long after
+        # the entry has been evicted.
+        output_path = os.path.splitext(pdf_path)[0] + extension(output_format)
+        shutil.copyfile(cached, output_path)
+        return output_path
+    return convert_document(doc_type, pdf_path, backend, digest, output_format)
+
+PARSERS = {
+    "courier": parse_courier_pages,
+    "boe": parse_boe_pages,
+    "cargo": parse_cargo_pages,
+}
+
+def parse_document(doc_type, pdf_path, backend=None, digest=None):
+    # Returns (resolved doc type, rows), stored like every other conversion
+    # (batch and CLI conversions come through here).
+    pages = load_pages(pdf_path, backend, digest)
+    doc_type = resolve_doc_type(doc_type, pages)
+    rows = PARSERS[doc_type](pages)
+    store_rows(doc_type, rows, pdf_path, digest)
+    return doc_type, rows
+
+def convert_document_in_memory(doc_type, pdf_path, backend=None, digest=None, output_format=DEFAULT_FORMAT):
+    # Like convert_document, but the output is returned as bytes for the
+    # waiting request to send, never written to the job directory.
+    resolved, rows = parse_document(doc_type, pdf_path, backend, digest)
+    with stage("export"):
+        output = export_bytes(rows, resolved, output_format)
+    if digest:
+        result_cache.store_bytes(workbook_key(digest, doc_type, backend, output_format), extension(output_format), output)
+    return output
+
+# ===================== METRICS =====================
+def job_finished(job):
+    # Runs on the job's worker thread once it has finished. Workbook cache
+    # hits are counted by the cache metric, not as conversions.
+    if job.stages.notes.get("workbook_cache") == "hit":
+        return
+    doc_type = job.stages.notes.get("doc_type", job.args[0])
+    outcome = "ok" if job.status == "done" else job.status
+    metrics.inc("pdf_conversions_total", doc_type=doc_type, outcome=outcome)
+    if job.status == "failed":
+        metrics.inc("pdf_conversion_failures_total", stage=job.stages.failed or "other")
+    elif job.status == "timeout":
+        metrics.inc("pdf_conversion_timeouts_total", stage=job.stages.failed or "queued")
+    metrics.observe_stages(job.stages)
+
+job_queue = JobQueue(on_finish=job_finished)
+metrics.gauge("pdf_job_queue_depth", job_queue.depth)
+
+def log_fields(**fields):
+    # Adds fields to this request's log line.
+    g.setdefault('log', {}).update(fields)
+
+def log_job(job):
+    log_fields(job=job.id, doc_type=job.stages.notes.get("doc_type"), pages_cache=job.stages.notes.get("pages_cache"),
+               error=job.error, **{f"{name}_ms": seconds * 1000 for name, seconds in job.stages.items()})
+
+@app.before_request
+def start_timer():
+    g.start = time.perf_counter()
+
+class CountingBody:
+    """Streamed response body that counts the bytes sent through it.
+
+    ``on_close(size)`` runs once when the server closes the body, whether it
+    was sent in full, cut short by the client or never iterated at all.
+    """
+
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self.body:
+            self.size += len(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8"))
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.body, "close"):
+                self.body.close()
+        finally:
+            on_close, self.on_close = self.on_close, None
+            if on_close:
+                on_close(self.size)
+
+@app.after_request
+def record_request(response):
+    # Counts every request and prints one logfmt line per request (scrapes
+    # of /metrics excepted). Stage timings appear when the request waited
+    # for its conversion. A streamed body has no length up front: its bytes
+    # are counted as it is sent and the line is printed once it is closed.
+    seconds = time.perf_counter() - g.get('start', time.perf_counter())
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.inc("pdf_requests_total", endpoint=endpoint, status=response.status_code)
+    metrics.observe("pdf_request_duration_seconds", seconds, endpoint=endpoint)
+    if request.content_length:
+        metrics.inc("pdf_bytes_in_total", request.content_length, endpoint=endpoint)
+    fields = {
+        "event": "request",
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "ms": seconds * 1000,
+        "bytes_in": request.content_length,
+        "bytes_out": response.content_length,
+        "cache": response.headers.get('X-Cache'),
+        **g.get('log', {}),
+    }
 
-
-# ===================== UPLOAD ENDPOINT =====================
-@app.route('/upload-pdf', methods=['POST'])
-def upload_pdf():
+    def sent(size):
+        if size:
+            metrics.inc("pdf_bytes_out_total", size, endpoint=endpoint)
+        if endpoint != "/metrics":
+            print(metrics.logfmt({**fields, "bytes_out": size}), flush=True)
+
+    if response.content_length is None and response.is_streamed and not response.direct_passthrough:
+        response.response = CountingBody(response.response, sent)
+    else:
+        sent(response.content_length)
+    return response
+
+@app.teardown_request
+def discard_spool(exc=None):
+    # Whatever happened to the request, spooled files no job took over go.
+    if request.spool is not None:
+        request.spool.discard()
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({'error': e.description}), 413
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+def save_upload():
     if 'file' not in request.files:
-        return jsonify({'error': 'No file uploaded'}), 400
+        return None, (jsonify({'error': 'No file uploaded'}), 400)
 
     file = request.files['file']
     if not file.filename.lower().endswith(".pdf"):
-        return jsonify({'error': 'Only PDF files allowed'}), 400
-
-    doc_type = request.form.get('docType', 'courier')  # default to courier if not provided
+        return None, (jsonify({'error': 'Only PDF files allowed'}), 400)
+
+    doc_type = request.form.get('docType', AUTO)  # detected from the first page if not provided
+    if doc_type not in PROCESSORS and doc_type != AUTO:
+        return None, (jsonify({'error': 'Invalid document type'}), 400)
+    backend = request.form.get('backend')  # converter backend, defaults to PDF_BACKEND
+    output_format = request.values.get('format', DEFAULT_FORMAT)  # xlsx, csv, parquet or jsonl
+    error = format_error(output_format)
+    if error:
+        return None, (jsonify({'error': error}), 400)
     filename_base = os.path.splitext(secure_filename(file.filename))[0]
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        file.save(tmp.name)
-        try:
-            if doc_type == "courier":
-                output_path, _ = process_courier_pdf(tmp.name)
-            elif doc_type == "boe":
-                output_path = process_boe_pdf(tmp.name)  # Only one value returned
-            else:
-                return jsonify({'error': 'Invalid document type'}), 400
-        except Exception as e:
-            print(f"Error during PDF processing: {e}")
-            return jsonify({'error': str(e)}), 500
+    # Each upload gets its own scratch directory, the one it was spooled
+    # into; the PDF (and therefore the generated workbook) is named after
+    # the job id.
+    spool = request.spool
+    pdf_path = os.path.join(spool.dir, f"{spool.job_id}.pdf")
+    return {
+        'job_id': spool.job_id,
+        'job_dir': spool.dir,
+        'pdf_path': pdf_path,
+        'doc_type': doc_type,
+        'backend': backend,
+        'digest': spool.keep(file, pdf_path),
+        'format': output_format,
+        'download_name': f"{filename_base}{extension(output_format)}",
+    }, None
+
+def submit_upload(upload, func):
+    try:
+        job = job_queue.submit(upload['job_id'], upload['job_dir'], func, upload['doc_type'],
+                               upload['pdf_path'], upload['backend'], upload['digest'], upload['format'],
+                               download_name=upload['download_name'])
+    except QueueFull as e:
+        return None, (jsonify({'error': str(e)}), 429, {'Retry-After': '5'})
+    request.spool.claimed = True
+    return job, None
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    upload, error = save_upload()
+    if error:
+        return error
+    job, error = submit_upload(upload, convert_document_cached)
+    if error:
+        return error
+    log_fields(job=job.id)
+    return jsonify({'job_id': job.id, 'status': job.status}), 202, {'Location': f"/jobs/{job.id}"}
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    status.pop('result', None)
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    # Only jobs queued in this process can be cancelled.
+    if job_queue.cancel(job_id, "cancelled by the client"):
+        return jsonify({'job_id': job_id, 'status': 'cancelling'}), 202
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify({'job_id': job_id, 'status': status['status']}), 409
+
+# Status codes for jobs that did not produce a result.
+JOB_ERRORS = {"failed": 500, "timeout": 504, "cancelled": 410}
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if status['status'] in JOB_ERRORS:
+        return jsonify({'error': status['error']}), JOB_ERRORS[status['status']]
+    if status['status'] != "done":
+        return jsonify({'job_id': job_id, 'status': status['status']}), 409
+    return send_file(status['result'], as_attachment=True, download_name=status['download_name'])
+
+# ===================== BATCH ENDPOINT =====================
+BATCH_FORMATS = {
+    "xlsx": (iter_batch_workbook, "batch.xlsx", XLSX_MIMETYPE),
+    "zip": (iter_batch_zip, "batch.zip", "application/zip"),
+}
+
+@app.route('/upload-batch', methods=['POST'])
+def upload_batch():
+    files = request.files.getlist('files') or request.files.getlist('file')
+    if not files:
+        return jsonify({'error': 'No file uploaded'}), 400
 
+    # One docType applies to the whole batch; otherwise one per file, in order.
+    doc_types = request.form.getlist('docType') or [AUTO]
+    if len(doc_types) == 1:
+        doc_types = doc_types * len(files)
+    if len(doc_types) != len(files):
+        return jsonify({'error': 'docType must be given once or once per file'}), 400
+
+    output_format = request.form.get('format', 'xlsx')
+    if output_format not in BATCH_FORMATS:
+        return jsonify({'error': 'Invalid output format'}), 400
+    backend = request.form.get('backend')
+
+    # The batch is parsed in the directory its files were spooled into,
+    # which goes when the request ends.
+    job_id, job_dir = request.spool.job_id, request.spool.dir
+    tasks = []
+    for i, (file, doc_type) in enumerate(zip(files, doc_types)):
+        task = {'file': secure_filename(file.filename) or f"file_{i}.pdf", 'doc_type': doc_type, 'args': None}
+        if not file.filename.lower().endswith(".pdf"):
+            task['error'] = 'Only PDF files allowed'
+        elif doc_type not in PARSERS and doc_type != AUTO:
+            task['error'] = 'Invalid document type'
+        else:
+            pdf_path = os.path.join(job_dir, f"{i:04d}.pdf")
+            task['args'] = (doc_type, pdf_path, backend, request.spool.keep(file, pdf_path))
+        tasks.append(task)
+
+    results, summary = run_batch(parse_document, tasks)
+    for result in results:
+        metrics.inc("pdf_conversions_total", doc_type=result['doc_type'], outcome=result['status'])
+    log_fields(job=job_id, files=summary['files'], failed=summary['failed'])
+    print(f"Batch {job_id}: {summary['files']} files, {summary['failed']} failed, "
+          f"{summary['seconds']}s ({summary['files_per_second']} files/s)")
+
+    # The workbook is streamed into the response as it is written.
+    writer, download_name, mimetype = BATCH_FORMATS[output_format]
+    response = Response(writer(results, summary), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={download_name}'
+    response.headers.update(summary_headers(summary))
+    return response
+
+# ===================== STORED DOCUMENTS =====================
+STORAGE_DISABLED = ({'error': 'Database storage is disabled (set DATABASE_URL)'}, 404)
+
+@app.route('/documents', methods=['GET'])
+def list_stored_documents():
+    if not storage.enabled():
+        return jsonify(STORAGE_DISABLED[0]), STORAGE_DISABLED[1]
+    return jsonify(storage.list_documents(digest=request.args.get('digest'),
+                                          doc_type=request.args.get('docType'),
+                                          limit=request.args.get('limit', 50, type=int)))
+
+@app.route('/documents/<int:document_id>', methods=['GET'])
+def stored_document(document_id):
+    if not storage.enabled():
+        return jsonify(STORAGE_DISABLED[0]), STORAGE_DISABLED[1]
+    document, rows = storage.load_document(document_id)
+    if document is None:
+        return jsonify({'error': 'Unknown document'}), 404
+    return jsonify({'document': document, 'rows': rows})
+
+@app.route('/documents/<int:document_id>/export', methods=['GET'])
+def export_stored_document(document_id):
+    # Re-download from the database, without converting the PDF again.
+    if not storage.enabled():
+        return jsonify(STORAGE_DISABLED[0]), STORAGE_DISABLED[1]
+    output_format = request.args.get('format', DEFAULT_FORMAT)
+    error = format_error(output_format)
+    if error:
+        return jsonify({'error': error}), 400
+    document, rows = storage.load_document(document_id)
+    if document is None:
+        return jsonify({'error': 'Unknown document'}), 404
+
+    # Streamed (chunked) as it is written.
+    response = Response(iter_export(rows, document['doc_type'], output_format), mimetype=mimetype(output_format))
+    response.headers['Content-Disposition'] = f'attachment; filename=document_{document_id}{extension(output_format)}'
+    return response
+
+# ===================== UPLOAD ENDPOINT =====================
+# How often a request waiting for its conversion checks the client is still there.
+DISCONNECT_POLL = 0.5
+
+def client_disconnected():
+    # The upload body has been read, so a readable socket with nothing to
+    # peek at means the client closed the connection. Servers that do not
+    # expose the socket never report a disconnect.
+    sock = request.environ.get('gunicorn.socket') or request.environ.get('werkzeug.socket')
+    if sock is None:
+        return False
     try:
-        return send_file(output_path, as_attachment=True, download_name=f"{filename_base}.xlsx")
-    except Exception as e:
-        print(f"Error sending file: {e}")
-        return jsonify({'error': 'Failed to send the Excel file.'}), 500
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable) and not sock.recv(1, socket.MSG_PEEK)
+    except (OSError, ValueError):
+        return True
 
+@app.route('/upload-pdf', methods=['POST'])
+def upload_pdf():
+    upload, error = save_upload()
+    if error:
+        return error
+
+    # Repeat uploads are answered straight from the cache, without queueing.
+    cached = cached_workbook(upload['digest'], upload['doc_type'], upload['backend'], upload['format'])
+    cache_result("workbook", bool(cached))
+    if cached:
+        response = send_file(cached, as_attachment=True, download_name=upload['download_name'])
+        response.headers['X-Cache'] = 'HIT'
+        log_fields(job=upload['job_id'], doc_type=upload['doc_type'])
+        print(f"Cache hit for {upload['digest'][:12]} ({upload['doc_type']})")
+        return response
+
+    # The output is built in memory and sent from there with its length.
+    job, error = submit_upload(upload, convert_document_in_memory)
+    if error:
+        return error
+
+    # Nobody is left to receive the file once the client goes away, so
+    # the conversion is cancelled rather than left to run on. Nobody polls
+    # a synchronous job either: its directory (PDF, page JSON) goes as soon
+    # as the job stops.
+    while not job.wait(DISCONNECT_POLL):
+        if client_disconnected():
+            job_queue.cancel(job.id, "client disconnected")
+            job_queue.discard(job)
+            log_fields(job=job.id, error="client disconnected")
+            return jsonify({'error': 'Client disconnected'}), 499
+    job_queue.discard(job)
+    log_job(job)
+    if job.status in JOB_ERRORS:
+        return jsonify({'error': job.error}), JOB_ERRORS[job.status]
+
+    response = send_file(io.BytesIO(job.result), mimetype=mimetype(upload['format']), as_attachment=True,
+                         download_name=job.download_name)
+    response.headers['X-Cache'] = 'MISS'
+    return response
 
 
 if __name__ == '__main__':
+    if os.environ.get('WERKZEUG_RUN_MAIN'):  # the reloader's serving process
+        prelaunch()
     app.run(debug=True, port=5001)
\ No newline at end of file
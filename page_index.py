@@ -0,0 +1,45 @@
+class PageIndex:
+    """Per-page view of the converter output.
+
+    Records, for each named section header, the first page that contains
+    it, so a parser can search only the pages from (or up to) a section
+    instead of the whole document. That page is found on first use with a
+    plain substring check per page, stopping at the first hit. Texts are joined with the same " " the
+    parsers used on the full document, so text_from() is an exact suffix of
+    full_text and text_until() an exact prefix - a pattern that starts at
+    the section header finds the same matches in either.
+    """
+
+    def __init__(self, texts, sections):
+        self.texts = list(texts)
+        self.sections = sections
+        self._first = {}
+        self._full_text = None
+
+    @property
+    def full_text(self):
+        if self._full_text is None:
+            self._full_text = " ".join(self.texts)
+        return self._full_text
+
+    def first(self, name):
+        # Stops at the first page carrying the header.
+        if name not in self._first:
+            header = self.sections[name]
+            self._first[name] = next((i for i, t in enumerate(self.texts) if header in t), None)
+        return self._first[name]
+
+    def text_from(self, name):
+        # Everything from the first page carrying the section; "" without one.
+        start = self.first(name)
+        return "" if start is None else " ".join(self.texts[start:])
+
+    def text_until(self, *names):
+        # Pages up to and including the first page of the latest-starting
+        # section (the whole document if one is missing), plus the separator
+        # that follows them in full_text.
+        firsts = [self.first(name) for name in names]
+        if None in firsts or max(firsts) + 1 >= len(self.texts):
+            return self.full_text
+        end = max(firsts) + 1
+        return " ".join(self.texts[:end]) + " "
@@ -1,13 +1,13 @@
 import os
 import re
 import json
-import time
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from download_wait import wait_for_download
 
 # === CONFIGURATION ===
 pdf_path = r"C:\Users\User\Downloads\New BOE XIII.pdf"  # Set your PDF path here
@@ -41,10 +41,7 @@ convert_button = wait.until(EC.element_to_be_clickable((By.ID, "convertButton"))
 convert_button.click()
 
 print("⏳ Waiting for conversion and download...")
-for _ in range(30):
-    if os.path.exists(json_path):
-        break
-    time.sleep(1)
+wait_for_download(json_path, timeout=30)
 
 driver.quit()
 
@@ -1,13 +1,13 @@
 import json
 import re
 import os
-import time
 import pandas as pd
 from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from download_wait import wait_for_download
 
 # === Config ===
 # pdf_file_path = r"C:\Users\User\Downloads\Courier BOE XIII.pdf"  # Change this to your file
@@ -40,10 +40,7 @@ convert_btn = wait.until(EC.element_to_be_clickable((By.ID, "convertButton")))
 convert_btn.click()
 
 print("⏳ Waiting for conversion and download...")
-for _ in range(30):
-    if os.path.exists(json_path):
-        break
-    time.sleep(1)
+wait_for_download(json_path, timeout=30)
 
 driver.quit()
 
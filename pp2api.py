@@ -1,12 +1,10 @@
 from flask import Flask, request, jsonify, send_file, render_template
-import os, re, json, tempfile, time
-import pandas as pd
+import io, os, re
 from werkzeug.utils import secure_filename
-from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from converter import convert_pdf
+from field_specs import column_types
+from xlsx_stream import iter_xlsx, sheet
+from workspace import create_job_dir, remove_job_dir
 
 app = Flask(__name__)
 
@@ -23,46 +21,10 @@ def get_between(start, end, text):
     match = re.search(pattern, text, re.DOTALL)
     return match.group(1).strip() if match else "Not Found"
 
-def process_pdf(pdf_path):
+def process_pdf(pdf_path, backend=None):
     pdf_name_only = os.path.splitext(os.path.basename(pdf_path))[0]
-    download_folder = os.path.dirname(pdf_path)
-    json_path = os.path.join(download_folder, "converted.json")
-
-    options = Options()
-    options.add_experimental_option("prefs", {
-        "download.default_directory": download_folder,
-        "download.prompt_for_download": False,
-        "directory_upgrade": True
-    })
-    driver = Chrome(options=options)
-    driver.get("https://ilovepdf4.com/pdf-to-json/")
-    wait = WebDriverWait(driver, 20)
 
-    try:
-        iframe = wait.until(EC.presence_of_element_located((By.TAG_NAME, "iframe")))
-        driver.switch_to.frame(iframe)
-    except:
-        pass
-
-    upload_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
-    upload_input.send_keys(pdf_path)
-
-    convert_btn = wait.until(EC.element_to_be_clickable((By.ID, "convertButton")))
-    convert_btn.click()
-
-    for _ in range(30):
-        if os.path.exists(json_path):
-            break
-        time.sleep(1)
-
-    driver.quit()
-
-    if not os.path.exists(json_path):
-        raise FileNotFoundError("Converted JSON file not found.")
-
-    with open(json_path, "r", encoding="utf-8") as f:
-        raw_data = json.load(f)
-    os.remove(json_path)
+    raw_data = convert_pdf(pdf_path, backend)
 
     full_text = " ".join([entry["content"] for entry in raw_data if entry.get("content")])
 
@@ -143,10 +105,9 @@ def process_pdf(pdf_path):
         }
         final_data.append(row)
 
-    df = pd.DataFrame(final_data)
-    output_file = os.path.join(download_folder, f"{pdf_name_only}.xlsx")
-    df.to_excel(output_file, index=False)
-    return output_file, pdf_name_only
+    # The workbook is built in memory and sent from there.
+    workbook = b"".join(iter_xlsx([sheet("Sheet1", final_data, types=column_types("courier"))]))
+    return workbook, pdf_name_only
 
 
 @app.route('/upload-courier-boe', methods=['POST'])
@@ -160,14 +121,19 @@ def upload_courier_boe():
 
     filename_base = os.path.splitext(secure_filename(file.filename))[0]
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        file.save(tmp.name)
-        try:
-            output_path, _ = process_pdf(tmp.name)
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
-
-    return send_file(output_path, as_attachment=True, download_name=f"{filename_base}.xlsx")
+    # The PDF and the converter's JSON share a job directory, removed before
+    # the workbook is sent.
+    job_id, job_dir = create_job_dir()
+    pdf_path = os.path.join(job_dir, f"{job_id}.pdf")
+    try:
+        file.save(pdf_path)
+        workbook, _ = process_pdf(pdf_path)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        remove_job_dir(job_dir)
+
+    return send_file(io.BytesIO(workbook), as_attachment=True, download_name=f"{filename_base}.xlsx")
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
@@ -0,0 +1,192 @@
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import contextlib
+
+# Scratch and cache directories live in a fresh directory so only this run's
+# files are measured; async results expire quickly so /jobs is soaked too.
+SOAK_DIR = tempfile.mkdtemp(prefix="pdf_soak_")
+SCRATCH_DIR = os.environ["PDF_SCRATCH_DIR"] = os.path.join(SOAK_DIR, "scratch")
+CACHE_DIR = os.environ["RESULT_CACHE_DIR"] = os.path.join(SOAK_DIR, "cache")
+os.environ.setdefault("RESULT_CACHE_MAX_MB", "1")
+os.environ.setdefault("JOB_RESULT_TTL", "1")
+os.environ.setdefault("JOB_PURGE_INTERVAL", "0.5")
+os.environ.setdefault("MAX_UPLOAD_MB", "1")
+
+import driver_pool
+from driver_pool import DriverPool
+from converter import CONVERTER_URL
+from stress_upload import FakeDriver, boe_text
+from spool import MAX_UPLOAD_MB
+from newapi import app
+
+# === Request mix ===
+# Every upload kind the service handles, each with the status it must get:
+# fresh and repeated (cached) conversions, async jobs fetched by polling,
+# rejected, oversized and failing uploads. After each request every file
+# it created must be gone (async ones once their result expires), so the
+# scratch directory and RSS stay flat however many requests are made; the
+# result cache fills up to its size cap and no further.
+
+
+def post(client, path, body, filename, **form):
+    return client.post(path, data={"file": (io.BytesIO(body), filename), **form}, content_type="multipart/form-data")
+
+
+def convert(client, n):
+    return post(client, "/upload-pdf", boe_text(f"CB{n:06d}").encode(), "a.pdf", docType="boe", backend="selenium")
+
+
+def repeat(client, n):
+    return post(client, "/upload-pdf", boe_text("CB-REPEAT").encode(), "a.pdf", docType="boe", backend="selenium")
+
+
+def async_job(client, n):
+    response = post(client, "/jobs", boe_text(f"CJ{n:06d}").encode(), "a.pdf", docType="boe", backend="selenium")
+    if response.status_code != 202:
+        return response
+    job_id = response.json["job_id"]
+    while client.get(f"/jobs/{job_id}").json["status"] in ("queued", "running"):
+        time.sleep(0.01)
+    return client.get(f"/jobs/{job_id}/result")
+
+
+def not_pdf(client, n):
+    return post(client, "/upload-pdf", b"hello", "a.txt")
+
+
+def oversized(client, n):
+    return post(client, "/upload-pdf", b"%" * (MAX_UPLOAD_MB * 2 ** 20 + 1), "big.pdf")
+
+
+def undetectable(client, n):
+    return post(client, "/upload-pdf", f"nothing to see {n}".encode(), "a.pdf", backend="selenium")
+
+
+KINDS = [(convert, 200), (repeat, 200), (async_job, 200), (not_pdf, 400), (oversized, 413), (undetectable, 500)]
+
+
+# === Measurements ===
+def disk_usage(path):
+    files = size = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                size += os.path.getsize(os.path.join(root, name))
+                files += 1
+            except OSError:
+                pass
+    return files, size
+
+
+def rss_bytes():
+    # Current resident set size (Linux); peak RSS elsewhere.
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def sample(done):
+    files, size = disk_usage(SCRATCH_DIR)
+    return {"requests": done, "files": files, "disk_mb": size / 2 ** 20,
+            "cache_mb": disk_usage(CACHE_DIR)[1] / 2 ** 20, "rss_mb": rss_bytes() / 2 ** 20}
+
+
+def growth(samples, key):
+    # Mean of the second half of the samples over the mean of the first,
+    # so one-off peaks (a burst of async results) don't count.
+    half = len(samples) // 2
+    first, second = samples[:half], samples[half:]
+    return sum(s[key] for s in second) / len(second) - sum(s[key] for s in first) / len(first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak /upload-pdf and /jobs, checking disk use and RSS stay flat.")
+    parser.add_argument("--uploads", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--max-disk-growth-mb", type=float, default=1.0)
+    parser.add_argument("--max-rss-growth-mb", type=float, default=20.0)
+    args = parser.parse_args()
+
+    driver_pool._pool = DriverPool(CONVERTER_URL, size=args.concurrency, factory=FakeDriver)
+    counter = iter(range(args.uploads))
+    lock = threading.Lock()
+    errors = []
+    samples = []
+    done = [0]
+    every = max(1, args.uploads // args.samples)
+
+    def run():
+        client = app.test_client()
+        while True:
+            with lock:
+                n = next(counter, None)
+            if n is None:
+                return
+            func, expected = KINDS[n % len(KINDS)]
+            response = func(client, n)
+            status = response.status_code
+            response.close()
+            with lock:
+                if status != expected:
+                    errors.append(f"{func.__name__} #{n}: {status}, expected {expected}")
+                done[0] += 1
+                if done[0] % every == 0:
+                    samples.append(sample(done[0]))
+
+    print(f"{'requests':>9} {'files':>6} {'disk MB':>8} {'cache MB':>9} {'RSS MB':>8}")
+    start = time.perf_counter()
+    # The service's per-request log lines would drown the table.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        threads = [threading.Thread(target=run) for _ in range(args.concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # Async results outlive their request by the result TTL.
+        time.sleep(float(os.environ["JOB_RESULT_TTL"]) + 3 * float(os.environ["JOB_PURGE_INTERVAL"]))
+    wall = time.perf_counter() - start
+    scratch_left = disk_usage(SCRATCH_DIR)[0]
+    shutil.rmtree(SOAK_DIR, ignore_errors=True)
+    for s in samples:
+        print(f"{s['requests']:>9} {s['files']:>6} {s['disk_mb']:>8.2f} {s['cache_mb']:>9.2f} {s['rss_mb']:>8.1f}")
+
+    failures = errors[:10]
+    if scratch_left:
+        failures.append(f"{scratch_left} file(s) left in the scratch directory")
+    disk_growth, rss_growth = growth(samples, "disk_mb"), growth(samples, "rss_mb")
+    if disk_growth > args.max_disk_growth_mb:
+        failures.append(f"scratch disk use grew by {disk_growth:.2f} MB")
+    # Concurrent stores may overshoot the cap by a few entries until evicted.
+    cache_peak = max(s["cache_mb"] for s in samples)
+    if cache_peak > 1.1 * float(os.environ["RESULT_CACHE_MAX_MB"]):
+        failures.append(f"result cache reached {cache_peak:.2f} MB, over its cap")
+    if rss_growth > args.max_rss_growth_mb:
+        failures.append(f"RSS grew by {rss_growth:.1f} MB")
+
+    print(f"\n{args.uploads} requests in {wall:.1f}s; scratch {disk_growth:+.2f} MB, RSS {rss_growth:+.1f} MB "
+          f"(second half of the run over the first)")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if len(errors) > 10:
+        print(f"❌ ... and {len(errors) - 10} more unexpected statuses")
+    if failures:
+        sys.exit(1)
+    print("✅ Every request cleaned up after itself; disk use and RSS stayed flat")
+
+
+if __name__ == "__main__":
+    main()
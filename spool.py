@@ -0,0 +1,77 @@
+import os
+import hashlib
+
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from cache import file_sha256
+from workspace import create_job_dir, remove_job_dir
+
+# Per-file limit, checked as each uploaded file is written, and limit of a
+# whole request body (several files in a batch), checked by werkzeug from
+# Content-Length before the body is read; both answer 413.
+MAX_UPLOAD_MB = int(os.environ.get("MAX_UPLOAD_MB", "50"))
+MAX_REQUEST_MB = int(os.environ.get("MAX_REQUEST_MB", "500"))
+
+
+class SpoolFile:
+    """File in a job directory that hashes and counts what is written to it.
+
+    Used as werkzeug's stream for an uploaded file, so the upload lands on
+    disk once, in the place the job reads it from, and its sha256 is known
+    without reading it back.
+    """
+
+    def __init__(self, path, max_bytes=MAX_UPLOAD_MB * 1024 * 1024):
+        self.name = path
+        self.size = 0
+        self.max_bytes = max_bytes
+        self._digest = hashlib.sha256()
+        self._file = open(path, "w+b")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise RequestEntityTooLarge(f"Uploaded file is larger than {self.max_bytes // (1024 * 1024)} MB")
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class Spool:
+    """The job directory one request streams its uploaded files into.
+
+    Created on the request's first file part. Unless claimed by a job (which
+    then owns the directory), it is removed when the request ends, however
+    the request ends.
+    """
+
+    def __init__(self):
+        self.job_id, self.dir = create_job_dir()
+        self.files = []
+        self.claimed = False
+
+    def open(self):
+        stream = SpoolFile(os.path.join(self.dir, f"upload_{len(self.files)}.part"))
+        self.files.append(stream)
+        return stream
+
+    def keep(self, storage, path):
+        # Moves an uploaded werkzeug FileStorage to `path`; returns its sha256.
+        stream = storage.stream
+        if isinstance(stream, SpoolFile):
+            stream.close()
+            os.replace(stream.name, path)
+            return stream.hexdigest()
+        storage.save(path)
+        return file_sha256(path)
+
+    def discard(self):
+        for stream in self.files:
+            stream.close()
+        if not self.claimed:
+            remove_job_dir(self.dir)
@@ -0,0 +1,62 @@
+import time
+import threading
+from contextlib import contextmanager
+
+from deadline import check
+
+# Stage names used by the processors, in pipeline order. browser, upload and
+# poll are the selenium converter's steps and run inside "load".
+STAGES = ["load", "browser", "upload", "poll", "classify", "join", "metadata", "items", "duties",
+          "assembly", "store", "export"]
+
+_local = threading.local()
+
+
+class Recording(dict):
+    """{stage: seconds}, plus the stage an exception escaped from and free-form notes."""
+
+    def __init__(self):
+        super().__init__()
+        self.failed = None
+        self.notes = {}
+
+
+@contextmanager
+def stage(name):
+    # Adds the block's wall time to the active recording on this thread;
+    # a no-op (one attribute lookup) when nothing is recording. Entering a
+    # stage is also a cancellation point for the active deadline.
+    check()
+    times = getattr(_local, "times", None)
+    if times is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        # Innermost stage wins: it is the first to see the exception.
+        if times.failed is None:
+            times.failed = name
+        raise
+    finally:
+        times[name] = times.get(name, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def record_stages():
+    """Collect {stage: seconds} for everything run on this thread inside the block."""
+    previous = getattr(_local, "times", None)
+    _local.times = times = Recording()
+    try:
+        yield times
+    finally:
+        _local.times = previous
+
+
+def note(**fields):
+    # Attaches fields (resolved doc type, cache outcome, ...) to the active
+    # recording, for the request log line.
+    times = getattr(_local, "times", None)
+    if times is not None:
+        times.notes.update(fields)
@@ -0,0 +1,153 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import pandas as pd
+
+import driver_pool
+from driver_pool import DriverPool
+from converter import CONVERTER_URL
+import newapi
+from newapi import app
+
+# === Stand-in converter ===
+# Behaves like the ilovepdf4 page driven by convert_selenium: the "PDF" is
+# plain text with pages separated by form feeds, and clicking Convert writes
+# converted.json (via a .crdownload temp name) into the session's download
+# directory after a random delay.
+
+
+class FakeElement:
+    def __init__(self, driver, kind):
+        self.driver = driver
+        self.kind = kind
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def send_keys(self, path):
+        self.driver.uploaded = path
+
+    def click(self):
+        threading.Thread(target=self.driver.finish_download, daemon=True).start()
+
+
+class FakeSwitchTo:
+    def frame(self, frame):
+        pass
+
+    def default_content(self):
+        pass
+
+
+class FakeDriver:
+    def __init__(self):
+        self.url = None
+        self.download_folder = None
+        self.uploaded = None
+        self.switch_to = FakeSwitchTo()
+
+    @property
+    def current_url(self):
+        return self.url
+
+    def get(self, url):
+        self.url = url
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.download_folder = params["downloadPath"]
+
+    def find_element(self, by, value):
+        return FakeElement(self, value)
+
+    def finish_download(self):
+        pdf_path, download_folder = self.uploaded, self.download_folder
+        time.sleep(random.uniform(0, 0.05))
+        with open(pdf_path, "r", encoding="utf-8") as f:
+            pages = [{"page": i, "content": c} for i, c in enumerate(f.read().split("\f"), 1)]
+        partial = os.path.join(download_folder, "converted.json.crdownload")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(pages, f)
+        os.replace(partial, os.path.join(download_folder, "converted.json"))
+
+    def quit(self):
+        pass
+
+
+def boe_text(number, items=3):
+    pages = [
+        f"CBEXIV Number : {number} BOE Date : 01/02/2024 "
+        "Import Export Branch Code : 0 Name : ACME IMPORTS Address : 1 Main Road Category Of Importer : X "
+        "SUPPLIER DETAILS Name : SUPPLYCO Address : 9 Far St IF SUPPLIER IS NOT THE SELLER "
+        "Invoice Number : INV1 Currency : USD"
+    ]
+    for i in range(items):
+        pages.append(
+            f"Item Description : WIDGET {i} General Description : Currency for Unit Price : USD "
+            f"Unit Price : 10 Unit of Measure : PCS Quantity : {i + 1} Rate Of Exchange : 83.1 "
+            f"Accessories none Assessable Value : {100 + i} Name of Manufacturer : MAKER Brand : B "
+            "BCD 10 0 0 12.5 AIDC 0 0 0 0 SW SRCHRG 10 0 0 1.25 IGST 18 0 0 25 CMPNSTRY 0 0 0 0"
+        )
+    pages.append("Challan Date 1 222 333 05/02/2024 DECLARATION")
+    return "\f".join(pages)
+
+
+def upload(client, number, results):
+    start = time.perf_counter()
+    while True:
+        data = {
+            "file": (io.BytesIO(boe_text(number).encode()), f"{number}.pdf"),
+            "docType": "boe",
+            "backend": "selenium",
+        }
+        response = client.post("/upload-pdf", data=data, content_type="multipart/form-data")
+        if response.status_code != 429:
+            break
+        time.sleep(0.1)  # queue full: back off and resubmit
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        results[number] = (False, elapsed, response.get_data(as_text=True))
+        return
+    df = pd.read_excel(io.BytesIO(response.data))
+    got = set(df["CBEXIV Number"])
+    results[number] = (got == {number} and len(df) == 3, elapsed, got)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire concurrent uploads at /upload-pdf using a stand-in converter.")
+    parser.add_argument("--uploads", type=int, default=48)
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args()
+
+    driver_pool._pool = DriverPool(CONVERTER_URL, size=args.pool_size, factory=FakeDriver)
+    # Every upload must go through the converter, not the result cache.
+    newapi.result_cache.enabled = False
+
+    results = {}
+    threads = []
+    start = time.perf_counter()
+    for n in range(args.uploads):
+        client = app.test_client()
+        t = threading.Thread(target=upload, args=(client, f"CB{n:04d}", results))
+        threads.append(t)
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    failures = {k: v for k, v in results.items() if not v[0]}
+    for number, (_, elapsed, detail) in sorted(failures.items()):
+        print(f"❌ {number}: {detail} ({elapsed:.2f}s)")
+    print(f"{len(results) - len(failures)}/{args.uploads} uploads returned their own data in {wall:.2f}s")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
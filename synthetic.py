@@ -0,0 +1,313 @@
+import os
+import json
+import random
+import argparse
+
+DUTIES = ["BCD", "AIDC", "SW SRCHRG", "IGST", "CMPNSTRY"]
+COUNTRIES = ["CHINA", "GERMANY", "JAPAN", "USA", "VIETNAM"]
+UNITS = ["PCS", "KGS", "NOS", "SET"]
+
+
+def _duty_rows(rng, duties=len(DUTIES)):
+    # duties < len(DUTIES) drops the trailing duty types from every item.
+    rows = []
+    for duty in DUTIES[:duties]:
+        rate = rng.choice([0, 5, 7.5, 10, 18])
+        rows.append(f"{duty} {rate} 0 0 {round(rng.uniform(0, 5000), 2)}")
+    return " ".join(rows)
+
+
+# ===================== BOE (CBEXIV) =====================
+def boe_header(rng, number, missing=()):
+    parts = [
+        f"CBEXIV Number : {number}",
+        "BOE Date : 01/02/2024",
+        "Port Code : INDEL4",
+        "Import Export Branch Code : 0 IEC : 0512345678",
+        "Name : ACME IMPORTS PVT LTD",
+        "Address : 12 INDUSTRIAL AREA PHASE II NEW DELHI 110020",
+        "Category Of Importer : OTHERS",
+        "SUPPLIER DETAILS",
+        "Name : SHENZHEN SUPPLY CO LTD",
+        "Address : 88 HIGH TECH PARK NANSHAN SHENZHEN",
+        "IF SUPPLIER IS NOT THE SELLER",
+        f"Country of Origin : {rng.choice(COUNTRIES)}",
+        f"Country of Consignment : {rng.choice(COUNTRIES)}",
+        "House Airway Bill (HAWB) Number : 7788990011",
+        "Master Airway Bill (MAWB) Number : 17612345675",
+        "Interest Amount : 0",
+        "Invoice Number : INV-2024-0042",
+        "Date of Invoice : 15/01/2024",
+        f"Invoice Value : {round(rng.uniform(1000, 90000), 2)}",
+        "Currency : USD",
+        "Currency Freight : 1.5 2100.0 USD Insurance : 1.125 512.0 USD",
+        "Loading : 0",
+    ]
+    return " ".join(p for p in parts if not any(p.startswith(m) for m in missing))
+
+
+def boe_item(rng, n, duties=len(DUTIES)):
+    unit_price = round(rng.uniform(1, 500), 2)
+    quantity = rng.randint(1, 500)
+    return " ".join([
+        f"ITEM DETAILS Item Sr No : {n}",
+        f"Item Description : WIDGET MODEL {n:05d} STEEL",
+        "General Description :",
+        "Currency for Unit Price : USD",
+        f"Unit Price : {unit_price}",
+        f"Unit of Measure : {rng.choice(UNITS)}",
+        f"Quantity : {quantity}",
+        "Rate Of Exchange : 83.15",
+        "Accessories : NIL",
+        f"Name of Manufacturer : MAKER {n % 17} INDUSTRIES",
+        "Brand : GENERIC",
+        f"Country of Origin : {rng.choice(COUNTRIES)}",
+        f"Assessable Value : {round(unit_price * quantity * 83.15, 2)}",
+        "DUTY DETAILS Duty Ad Valorem Specific Rate Duty Forgone Duty Amount",
+        _duty_rows(rng, duties),
+    ])
+
+
+def boe_pages(items=3, items_per_page=1, seed=0, number="CB0000001", missing=(), duties=len(DUTIES)):
+    rng = random.Random(seed)
+    pages = [boe_header(rng, number, missing)]
+    for start in range(0, items, items_per_page):
+        pages.append(" ".join(boe_item(rng, n + 1, duties)
+                              for n in range(start, min(start + items_per_page, items))))
+    pages.append(
+        "PAYMENT DETAILS Sr No TR-6 Challan Number Total Amount Challan Date "
+        "1 2024000123 512345 05/02/2024 DECLARATION We declare that the contents are true"
+    )
+    return [{"page": i, "content": content} for i, content in enumerate(pages, 1)]
+
+
+# ===================== COURIER (CBE-XIII) =====================
+def courier_item(rng, n, duties=len(DUTIES)):
+    quantity = rng.randint(1, 50)
+    unit_price = round(rng.uniform(1, 200), 2)
+    return " ".join([
+        f"ITEM : {n}",
+        f"Country of Origin : {rng.choice(COUNTRIES)}",
+        f"Description of Goods : SPARE PART {n:04d}",
+        f"Name of Manufacturer : MAKER {n % 11}",
+        "Address of Manufacturer : INDUSTRIAL ZONE",
+        f"Quantity : {quantity}",
+        f"Invoice Value : {round(quantity * unit_price, 2)}",
+        f"Unit Price : {unit_price}",
+        "Currency of Unit Price : USD",
+        "Rate of Exchange : 83.15",
+        f"Assessable Value : {round(quantity * unit_price * 83.15, 2)}",
+        "Insurance : 1.13",
+        "Freight : 20.0",
+        _duty_rows(rng, duties),
+        "NOTIFICATION USED FOR THE ITEM",
+    ])
+
+
+def courier_pages(items=3, items_per_page=2, seed=0, number="CBE0000001", duties=len(DUTIES)):
+    rng = random.Random(seed)
+    pages = [" ".join([
+        f"CBE-XIII Number {number}",
+        "HAWB Number : 7788990011",
+        "Name of Consignor : GLOBAL PARTS LTD",
+        "Address of Consignor : 1 HARBOUR ROAD HONG KONG",
+        "Name of Consignee : ACME IMPORTS PVT LTD",
+        "Address of Consignee : 12 INDUSTRIAL AREA NEW DELHI",
+        "Import Export Code : 0512345678",
+        "Interest Amount : 0",
+    ])]
+    for start in range(0, items, items_per_page):
+        pages.append(" ".join(courier_item(rng, n + 1, duties)
+                              for n in range(start, min(start + items_per_page, items))))
+    pages.append("TR-6 Challan Number Total Amount Challan Date 2024000123 51234 05/02/2024 DECLARATION")
+    return [{"page": i, "content": content} for i, content in enumerate(pages, 1)]
+
+
+# ===================== CARGO (bill of entry for home consumption) =====================
+def cargo_invoice(rng, n):
+    return " ".join([
+        f"INVOICE DETAILS Invoice Sr No : {n}",
+        f"Invoice Number : EXP/{2024}/{n:04d}",
+        "Invoice Date : 15/01/2024",
+        f"Invoice Amount : {round(rng.uniform(10000, 900000), 2)}",
+        "Currency : USD",
+        f"Incoterms : {rng.choice(['CIF', 'FOB', 'CFR'])}",
+        f"Freight : {round(rng.uniform(100, 5000), 2)}",
+        f"Insurance : {round(rng.uniform(10, 500), 2)}",
+        f"Supplier Name : {rng.choice(['NINGBO', 'SHENZHEN', 'HAMBURG'])} TRADING CO LTD",
+        f"Supplier Address : {rng.randint(1, 999)} PORT ROAD INDUSTRIAL DISTRICT",
+        f"Supplier Country : {rng.choice(COUNTRIES)}",
+    ])
+
+
+def cargo_item(rng, n, invoices, duties=len(DUTIES)):
+    unit_price = round(rng.uniform(1, 900), 2)
+    quantity = rng.randint(1, 2000)
+    return " ".join([
+        f"ITEM DETAILS Invoice Sr No : {1 + (n - 1) % invoices}",
+        f"Item Sr No : {n}",
+        f"CTH : {rng.choice(['84713010', '85176290', '73181500', '39269099'])}",
+        f"Description : INDUSTRIAL COMPONENT TYPE {n:05d} GRADE {rng.choice('ABC')}",
+        f"Unit Price : {unit_price}",
+        f"Quantity : {quantity}",
+        f"UQC : {rng.choice(UNITS)}",
+        f"Country of Origin : {rng.choice(COUNTRIES)}",
+        f"Assessable Value : {round(unit_price * quantity * 83.15, 2)}",
+        "DUTY DETAILS Duty Ad Valorem Specific Rate Duty Forgone Duty Amount",
+        _duty_rows(rng, duties),
+    ])
+
+
+def cargo_pages(items=3, items_per_page=10, seed=0, number="2345678", invoices=3, duties=len(DUTIES)):
+    rng = random.Random(seed)
+    invoices = max(1, min(invoices, items or 1))
+    pages = [" ".join([
+        "BILL OF ENTRY FOR HOME CONSUMPTION PART - I",
+        f"BE No : {number}",
+        "BE Date : 01/02/2024",
+        "BE Type : H",
+        "Port Code : INNSA1",
+        "IEC : 0512345678",
+        "GSTIN : 07AAACA1234A1Z5",
+        "Importer Name : ACME IMPORTS PVT LTD",
+        "Importer Address : 12 INDUSTRIAL AREA PHASE II NEW DELHI 110020",
+        "CB Code : AAACB1234BCH001",
+        "CB Name : SWIFT CLEARING AGENCY",
+        "IGM No : 4455667",
+        "IGM Date : 25/01/2024",
+        "Port of Loading : CNSHA",
+        f"Country of Consignment : {rng.choice(COUNTRIES)}",
+        "Bill of Lading No : MSKU7654321",
+        "B/L Date : 05/01/2024",
+        f"Gross Weight : {round(rng.uniform(500, 25000), 1)}",
+        f"Packages : {rng.randint(1, 400)}",
+        " ".join(cargo_invoice(rng, n + 1) for n in range(invoices)),
+    ])]
+    for start in range(0, items, items_per_page):
+        pages.append(" ".join(cargo_item(rng, n + 1, invoices, duties)
+                              for n in range(start, min(start + items_per_page, items))))
+    pages.append(
+        "PAYMENT DETAILS Challan Number : 2024000123 Paid On : 05/02/2024 Total Amount : 912345.5 "
+        "Interest Amount : 0 Penalty Amount : 0 Fine Amount : 0 DECLARATION We declare that the contents are true"
+    )
+    return [{"page": i, "content": content} for i, content in enumerate(pages, 1)]
+
+
+GENERATORS = {
+    "boe": boe_pages,
+    "courier": courier_pages,
+    "cargo": cargo_pages,
+}
+
+
+# ===================== CORPUS =====================
+def corpus(docs=30, max_items=500, seed=0, doc_types=tuple(GENERATORS)):
+    # Mixed sizes, skewed small like real traffic: most documents have a
+    # handful of items, a few run to max_items. Yields (name, spec, pages).
+    rng = random.Random(seed)
+    for n in range(docs):
+        doc_type = doc_types[n % len(doc_types)]
+        spec = {
+            "doc_type": doc_type,
+            "items": min(max_items, max(1, int(rng.paretovariate(1.2) * 3))),
+            "items_per_page": rng.choice([1, 2, 5, 10]),
+            "duties": rng.choice([len(DUTIES)] * 4 + [len(DUTIES) - 1]),
+            "seed": n,
+        }
+        pages = GENERATORS[doc_type](items=spec["items"], items_per_page=spec["items_per_page"],
+                                     seed=n, duties=spec["duties"])
+        yield f"{doc_type}_{n:04d}", spec, pages
+
+
+def write_corpus(directory, **kwargs):
+    os.makedirs(directory, exist_ok=True)
+    manifest = []
+    for name, spec, pages in corpus(**kwargs):
+        with open(os.path.join(directory, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(pages, f)
+        manifest.append({"file": f"{name}.json", "pages": len(pages), **spec})
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+# ===================== ADVERSARIAL =====================
+# Damaged documents: a label that ends a lazy value missing from every item
+# (a scanned page that lost a line, a template change), the document cut off
+# mid-item, or every space gone. Parsers must stay linear on all of them.
+DROPPED_LABELS = {
+    "boe": ["General Description", "Rate Of Exchange", "Accessories", "Assessable Value", "Brand",
+            "Address", "Loading", "DECLARATION"],
+    "courier": ["NOTIFICATION USED FOR THE ITEM", "Name of Manufacturer", "Address of Manufacturer",
+                "Import Export Code", "DECLARATION"],
+    "cargo": ["ITEM DETAILS", "Unit Price", "Assessable Value", "Supplier Country", "IGM No"],
+}
+
+
+def defects(doc_type):
+    return ["truncated", "squashed"] + [f"no {label}" for label in DROPPED_LABELS[doc_type]]
+
+
+def damage(pages, defect):
+    if defect == "truncated":
+        # Two thirds of the pages, the last one cut mid-way.
+        keep = pages[:max(1, len(pages) * 2 // 3)]
+        last = keep[-1]["content"]
+        return keep[:-1] + [{**keep[-1], "content": last[:len(last) // 2]}]
+    if defect == "squashed":
+        return [{**p, "content": "".join(p["content"].split())} for p in pages]
+    label = defect[len("no "):]
+    return [{**p, "content": p["content"].replace(label, "")} for p in pages]
+
+
+def adversarial_pages(doc_type, defect, items=3, items_per_page=5, seed=0):
+    return damage(GENERATORS[doc_type](items=items, items_per_page=items_per_page, seed=seed), defect)
+
+
+def write_adversarial(directory, items=200, doc_types=tuple(GENERATORS)):
+    os.makedirs(directory, exist_ok=True)
+    manifest = []
+    for doc_type in doc_types:
+        for defect in defects(doc_type):
+            name = f"{doc_type}_{defect.replace(' ', '_').lower()}"
+            with open(os.path.join(directory, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(adversarial_pages(doc_type, defect, items), f)
+            manifest.append({"file": f"{name}.json", "doc_type": doc_type, "defect": defect, "items": items})
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic converter JSON page list, or a corpus of them.")
+    parser.add_argument("doc_type", choices=sorted(GENERATORS) + ["corpus", "adversarial"])
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--items-per-page", type=int, default=1)
+    parser.add_argument("--duties", type=int, default=len(DUTIES), help="duty lines per item")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--docs", type=int, default=30, help="corpus: number of documents")
+    parser.add_argument("--max-items", type=int, default=500, help="corpus: largest document")
+    parser.add_argument("-o", "--output", default=None,
+                        help="JSON file (default converted.json), or corpus/adversarial directory")
+    args = parser.parse_args()
+
+    if args.doc_type == "adversarial":
+        output = args.output or "adversarial"
+        manifest = write_adversarial(output, items=args.items)
+        print(f"✅ {len(manifest)} damaged documents written to {output}")
+        return
+    if args.doc_type == "corpus":
+        output = args.output or "corpus"
+        manifest = write_corpus(output, docs=args.docs, max_items=args.max_items, seed=args.seed)
+        print(f"✅ {len(manifest)} documents ({sum(m['items'] for m in manifest)} items) written to {output}")
+        return
+    pages = GENERATORS[args.doc_type](items=args.items, items_per_page=args.items_per_page, seed=args.seed,
+                                      duties=args.duties)
+    output = args.output or "converted.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(pages, f)
+    print(f"✅ {len(pages)} pages written to {output}")
+
+
+if __name__ == "__main__":
+    main()
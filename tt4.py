@@ -1,5 +1,4 @@
 import os
-import time
 import re
 import json
 import pandas as pd
@@ -9,6 +8,7 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from download_wait import wait_for_download
 
 # === CONFIG ===
 pdf_file_path = r"C:\Users\User\Downloads\New BOE VI.pdf"
@@ -45,13 +45,13 @@ convert_btn.click()
 
 # === WAIT FOR DOWNLOAD ===
 print("⏳ Converting and downloading JSON...")
-time.sleep(20)
+json_path = os.path.join(download_folder, json_filename)
+wait_for_download(json_path, timeout=30)  # max wait ~30 seconds
 
 # === CLOSE BROWSER ===
 driver.quit()
 
 # === LOAD DOWNLOADED JSON ===
-json_path = os.path.join(download_folder, json_filename)
 if not os.path.exists(json_path):
     raise FileNotFoundError("JSON file not downloaded.")
 
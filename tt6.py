@@ -1,5 +1,4 @@
 import os
-import time
 import re
 import json
 import pandas as pd
@@ -9,6 +8,7 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from download_wait import wait_for_download
 
 
 # === CONFIG ===
@@ -43,10 +43,7 @@ convert_btn = wait.until(EC.element_to_be_clickable((By.ID, "convertButton")))
 convert_btn.click()
 
 print("⏳ Waiting for conversion and download...")
-for _ in range(30):
-    if os.path.exists(json_path):
-        break
-    time.sleep(1)
+wait_for_download(json_path, timeout=30)
 
 driver.quit()
 
@@ -1,5 +1,4 @@
 import os
-import time
 import re
 import json
 import pandas as pd
@@ -9,6 +8,7 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from download_wait import wait_for_download
 
 # === CONFIG ===
 pdf_file_path = r"C:\Users\Tejasree25\Downloads\New BOE VI.pdf"  # <-- Update to your PDF path
@@ -47,10 +47,7 @@ convert_btn.click()
 
 # === Wait for file download ===
 print("⏳ Waiting for conversion and download...")
-for _ in range(30):  # max wait ~30 seconds
-    if os.path.exists(json_path):
-        break
-    time.sleep(1)
+wait_for_download(json_path, timeout=30)  # max wait ~30 seconds
 
 driver.quit()
 
@@ -1,15 +1,12 @@
 from flask import Flask, request, jsonify, send_file, render_template
+import io
 import os
-import time
 import re
-import json
-import tempfile
 import pandas as pd
-from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from converter import convert_pdf
+from field_specs import column_types
+from xlsx_stream import iter_xlsx, sheet
+from workspace import create_job_dir, remove_job_dir
 from werkzeug.utils import secure_filename  # ✅ Added import
 
 app = Flask(__name__)
@@ -26,45 +23,8 @@ def extract(pattern, text, default="Not found"):
     match = re.search(pattern, text, re.DOTALL)
     return match.group(1).strip() if match else default
 
-def process_pdf(pdf_path):
-    pdf_name_only = os.path.splitext(os.path.basename(pdf_path))[0]
-    download_folder = os.path.dirname(pdf_path)
-    json_filename = "converted.json"
-    json_path = os.path.join(download_folder, json_filename)
-
-    options = Options()
-    options.add_experimental_option("prefs", {
-        "download.default_directory": download_folder,
-        "download.prompt_for_download": False,
-        "directory_upgrade": True
-    })
-    driver = Chrome(options=options)
-
-    driver.get("https://ilovepdf4.com/pdf-to-json/")
-    wait = WebDriverWait(driver, 20)
-    try:
-        iframe = wait.until(EC.presence_of_element_located((By.TAG_NAME, "iframe")))
-        driver.switch_to.frame(iframe)
-    except:
-        pass
-
-    upload_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
-    upload_input.send_keys(pdf_path)
-    convert_btn = wait.until(EC.element_to_be_clickable((By.ID, "convertButton")))
-    convert_btn.click()
-
-    for _ in range(30):
-        if os.path.exists(json_path):
-            break
-        time.sleep(1)
-
-    driver.quit()
-    if not os.path.exists(json_path):
-        raise FileNotFoundError("Converted JSON not found.")
-
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    os.remove(json_path)
+def process_pdf(pdf_path, backend=None):
+    data = convert_pdf(pdf_path, backend)
 
     full_text = " ".join([entry["content"] for entry in data])
     challan_block = extract(r"Challan Date\s*(.*?)\s*DECLARATION", full_text)
@@ -173,9 +133,8 @@ def process_pdf(pdf_path):
         }
         final_data.append(combined)
 
-    output_path = os.path.join(download_folder, f"{pdf_name_only}_converted.xlsx")
-    pd.DataFrame(final_data).to_excel(output_path, index=False)
-    return output_path
+    # The workbook is built in memory and sent from there.
+    return b"".join(iter_xlsx([sheet("Sheet1", final_data, types=column_types("boe"))]))
 
 @app.route('/upload-boe', methods=['POST'])
 def upload_boe():
@@ -188,14 +147,19 @@ def upload_boe():
 
     original_filename = os.path.splitext(secure_filename(file.filename))[0]  # ✅ Get base name without extension
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        file.save(tmp.name)
-        try:
-            output_file = process_pdf(tmp.name)
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
-
-    return send_file(output_file, as_attachment=True, download_name=f"{original_filename}.xlsx")  # ✅ Set download filename
+    # The PDF and the converter's JSON share a job directory, removed before
+    # the workbook is sent.
+    job_id, job_dir = create_job_dir()
+    pdf_path = os.path.join(job_dir, f"{job_id}.pdf")
+    try:
+        file.save(pdf_path)
+        workbook = process_pdf(pdf_path)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        remove_job_dir(job_dir)
+
+    return send_file(io.BytesIO(workbook), as_attachment=True, download_name=f"{original_filename}.xlsx")  # ✅ Set download filename
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
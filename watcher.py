@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import shutil
+import argparse
+
+from cache import file_sha256
+from jobs import JobQueue, QueueFull
+from workspace import create_job_dir, remove_job_dir
+from field_specs import REGISTRY
+from classifier import AUTO
+from exporters import DEFAULT_FORMAT, EXPORTERS, extension, format_error
+
+WATCH_INBOX = os.environ.get("WATCH_INBOX", "inbox")
+WATCH_OUTBOX = os.environ.get("WATCH_OUTBOX", "outbox")
+WATCH_DOC_TYPE = os.environ.get("WATCH_DOC_TYPE", AUTO)
+WATCH_FORMAT = os.environ.get("WATCH_FORMAT", DEFAULT_FORMAT)
+WATCH_INTERVAL = float(os.environ.get("WATCH_INTERVAL", "2"))
+WATCH_WORKERS = int(os.environ.get("WATCH_WORKERS", "2"))
+WATCH_QUEUE_SIZE = int(os.environ.get("WATCH_QUEUE_SIZE", "8"))
+WATCH_RETRIES = int(os.environ.get("WATCH_RETRIES", "3"))
+CHECKPOINT_FILE = ".checkpoint.json"
+
+
+def convert(doc_type, pdf_path, backend, digest, output_format):
+    # Imported on first use so `--help` and a bad inbox path fail fast
+    # without loading flask/selenium.
+    from newapi import convert_document_cached
+    return convert_document_cached(doc_type, pdf_path, backend, digest, output_format)
+
+
+class Checkpoint:
+    """Processed files, persisted in the outbox so a restart skips them.
+
+    ``files`` maps an inbox path to its last seen size/mtime, digest (so
+    unchanged files are not re-hashed every poll) and whether it has been
+    handled; ``digests`` maps a content hash to its output, which is what
+    deduplicates renamed or re-dropped copies of the same PDF. Only
+    successful conversions are recorded, so failed ones are retried.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.digests = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.digests = data.get("digests", {})
+        except (OSError, ValueError):
+            pass
+        # Failures recorded by older checkpoints are dropped (and retried).
+        self.digests = {d: done for d, done in self.digests.items() if done.get("status", "done") == "done"}
+        for seen in self.files.values():
+            seen["handled"] = seen["handled"] and seen["digest"] in self.digests
+
+    def digest(self, path, stat):
+        seen = self.files.get(path)
+        if seen and seen["size"] == stat.st_size and seen["mtime"] == stat.st_mtime_ns:
+            return seen["digest"]
+        digest = file_sha256(path)
+        self.files[path] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "digest": digest, "handled": False}
+        return digest
+
+    def handled(self, path, size=None):
+        # size: (size, mtime) as seen now; a changed file is new work.
+        seen = self.files.get(path)
+        return bool(seen and seen["handled"] and (size is None or (seen["size"], seen["mtime"]) == size))
+
+    def save(self, backlog=None):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files, "digests": self.digests, "backlog": backlog}, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+class Watcher:
+    def __init__(self, inbox=WATCH_INBOX, outbox=WATCH_OUTBOX, doc_type=WATCH_DOC_TYPE,
+                 output_format=WATCH_FORMAT, backend=None, workers=WATCH_WORKERS, max_queued=WATCH_QUEUE_SIZE,
+                 retries=WATCH_RETRIES):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.doc_type = doc_type
+        self.output_format = output_format
+        self.backend = backend
+        self.retries = retries
+        os.makedirs(outbox, exist_ok=True)
+        self.checkpoint = Checkpoint(os.path.join(outbox, CHECKPOINT_FILE))
+        self.queue = JobQueue(workers=workers, max_queued=max_queued)
+        self.sizes = {}      # path -> (size, mtime) from the previous poll
+        self.pending = []    # stable, not yet submitted: (path, doc_type, digest)
+        self.in_flight = {}  # digest -> (job, path)
+        self.attempts = {}   # path -> ((size, mtime), failed conversions of that version)
+        self.last_backlog = None
+
+    # ===================== SCAN =====================
+    def candidates(self):
+        # PDFs directly in the inbox use the default doc type; inbox/boe/ and
+        # inbox/courier/ pin theirs.
+        for folder, doc_type in [(self.inbox, self.doc_type)] + [
+                (os.path.join(self.inbox, t), t) for t in REGISTRY]:
+            try:
+                names = sorted(os.listdir(folder))
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(folder, name)
+                if name.lower().endswith(".pdf") and os.path.isfile(path):
+                    yield path, doc_type
+
+    def scan(self):
+        queued = {path for path, _, _ in self.pending} | {path for _, path in self.in_flight.values()}
+        sizes = {}
+        for path, doc_type in self.candidates():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            # Only pick a file up once its size and mtime held still for a
+            # whole interval, i.e. the copy into the inbox has finished.
+            sizes[path] = (stat.st_size, stat.st_mtime_ns)
+            if path in queued or self.checkpoint.handled(path, sizes[path]) or self.gave_up(path, sizes[path]):
+                continue
+            if self.sizes.get(path) != sizes[path]:
+                continue
+            digest = self.checkpoint.digest(path, stat)
+            if digest in self.in_flight or any(d == digest for _, _, d in self.pending):
+                continue
+            done = self.checkpoint.digests.get(digest)
+            if done and os.path.exists(done["output"]):
+                self.duplicate(path, done)
+                continue
+            self.pending.append((path, doc_type, digest))
+        self.sizes = sizes
+
+    def duplicate(self, path, done):
+        # Same content as an earlier file: reuse its output instead of
+        # converting again.
+        output = self.output_path(path)
+        if output != done["output"]:
+            shutil.copyfile(done["output"], output)
+        print(f"♻️ {path} duplicates {done['file']} -> {output}")
+        self.checkpoint.files[path]["handled"] = True
+        self.checkpoint.save(self.backlog())
+
+    def gave_up(self, path, size):
+        # Failed `retries` times in this run; a restart or a changed file
+        # tries again.
+        version, attempts = self.attempts.get(path, (None, 0))
+        return version == size and attempts >= self.retries
+
+    def output_path(self, path):
+        # Mirrors the inbox layout (inbox/boe/a.pdf -> outbox/boe/a.xlsx), so
+        # same-named PDFs in different folders never share an output.
+        relative = os.path.splitext(os.path.relpath(path, self.inbox))[0]
+        output = os.path.join(self.outbox, relative + extension(self.output_format))
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        return output
+
+    # ===================== DISPATCH =====================
+    def submit(self):
+        while self.pending:
+            path, doc_type, digest = self.pending[0]
+            job_id, job_dir = create_job_dir()
+            pdf_path = os.path.join(job_dir, f"{job_id}.pdf")
+            shutil.copyfile(path, pdf_path)
+            try:
+                job = self.queue.submit(job_id, job_dir, convert, doc_type, pdf_path,
+                                        self.backend, digest, self.output_format)
+            except QueueFull:
+                remove_job_dir(job_dir)
+                return
+            self.pending.pop(0)
+            self.in_flight[digest] = (job, path)
+
+    def collect(self):
+        for digest, (job, path) in list(self.in_flight.items()):
+            if not job.wait(0):
+                continue
+            del self.in_flight[digest]
+            if job.status == "done":
+                output = self.output_path(path)
+                shutil.move(job.result, output)
+                print(f"✅ {path} -> {output} ({job.finished - job.started:.1f}s)")
+                self.checkpoint.digests[digest] = {
+                    "file": path,
+                    "status": job.status,
+                    "output": output,
+                    "finished": job.finished,
+                }
+                self.checkpoint.files[path]["handled"] = True
+            else:
+                # Not processed: picked up again by the next scan, up to
+                # `retries` times.
+                seen = self.checkpoint.files[path]
+                version = (seen["size"], seen["mtime"])
+                previous, attempts = self.attempts.get(path, (None, 0))
+                attempts = attempts + 1 if previous == version else 1
+                self.attempts[path] = (version, attempts)
+                retry = "giving up" if attempts >= self.retries else "will retry"
+                print(f"❌ {path}: {job.error} (attempt {attempts}/{self.retries}, {retry})")
+            self.queue.discard(job)
+            self.checkpoint.save(self.backlog())
+
+    def backlog(self):
+        running = sum(1 for job, _ in self.in_flight.values() if job.status == "running")
+        return {
+            "pending": len(self.pending),
+            "queued": len(self.in_flight) - running,
+            "running": running,
+        }
+
+    def report(self):
+        backlog = self.backlog()
+        if backlog != self.last_backlog:
+            print(f"📥 backlog: {backlog['pending']} waiting, {backlog['queued']} queued, "
+                  f"{backlog['running']} running")
+            self.last_backlog = backlog
+
+    def poll(self):
+        self.collect()
+        self.scan()
+        self.submit()
+        self.report()
+
+    def settled(self):
+        # Every file currently in the inbox has an outcome in the checkpoint.
+        if self.pending or self.in_flight:
+            return False
+        return all(self.checkpoint.handled(path, size) or self.gave_up(path, size) for path, size in self.sizes.items())
+
+    def run(self, interval=WATCH_INTERVAL, once=False):
+        print(f"👀 Watching {self.inbox} -> {self.outbox} ({self.doc_type}, {self.output_format})")
+        try:
+            while True:
+                self.poll()
+                if once and self.settled():
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("⏹️ Stopping; unfinished files are picked up again on restart.")
+        finally:
+            self.checkpoint.save(self.backlog())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch an inbox directory and convert new PDFs into an outbox.")
+    parser.add_argument("--inbox", default=WATCH_INBOX)
+    parser.add_argument("--outbox", default=WATCH_OUTBOX)
+    parser.add_argument("--doc-type", default=WATCH_DOC_TYPE, choices=sorted(REGISTRY) + [AUTO])
+    parser.add_argument("--format", default=WATCH_FORMAT, choices=sorted(EXPORTERS))
+    parser.add_argument("--backend", help="converter backend, defaults to PDF_BACKEND")
+    parser.add_argument("--workers", type=int, default=WATCH_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=WATCH_QUEUE_SIZE)
+    parser.add_argument("--retries", type=int, default=WATCH_RETRIES, help="conversions tried per failing file")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="seconds between inbox scans")
+    parser.add_argument("--once", action="store_true", help="exit once the current inbox has been processed")
+    args = parser.parse_args()
+
+    error = format_error(args.format)
+    if error:
+        raise SystemExit(f"❌ {error}")
+    if not os.path.isdir(args.inbox):
+        raise SystemExit(f"❌ Inbox {args.inbox} does not exist")
+    Watcher(args.inbox, args.outbox, args.doc_type, args.format, args.backend,
+            args.workers, args.queue_size, args.retries).run(args.interval, args.once)
+
+
+if __name__ == "__main__":
+    main()
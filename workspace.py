@@ -0,0 +1,43 @@
+import os
+import time
+import uuid
+import shutil
+import tempfile
+
+SCRATCH_ROOT = os.environ.get("PDF_SCRATCH_DIR", os.path.join(tempfile.gettempdir(), "pdf_to_excel"))
+
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+
+def create_job_dir(job_id=None):
+    job_id = job_id or new_job_id()
+    job_dir = os.path.join(SCRATCH_ROOT, job_id)
+    os.makedirs(job_dir)
+    return job_id, job_dir
+
+
+def remove_job_dir(job_dir):
+    shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def remove_stale_dirs(max_age, keep=()):
+    # Removes job directories untouched for `max_age` seconds, e.g. those a
+    # killed worker never cleaned up. Returns how many were removed.
+    try:
+        names = os.listdir(SCRATCH_ROOT)
+    except OSError:
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in names:
+        path = os.path.join(SCRATCH_ROOT, name)
+        try:
+            if name in keep or os.path.getmtime(path) > cutoff:
+                continue
+        except OSError:
+            continue
+        remove_job_dir(path)
+        removed += 1
+    return removed
@@ -0,0 +1,199 @@
+import re
+import math
+import numbers
+import zipfile
+import datetime
+from itertools import chain
+from collections import namedtuple
+from xml.sax.saxutils import escape
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CHUNK_SIZE = 256 * 1024
+ROWS_PER_WRITE = 500
+# Level 1 deflate: several times faster than the default for ~15% larger files.
+COMPRESS_LEVEL = 1
+
+# rows: iterable of dicts. columns: defaults to the union of the row keys
+# in first-seen order (like pd.DataFrame) for a list, or to the first row's
+# keys for any other iterable, which is never materialised. types: column ->
+# "text" | "number" | "date" (see field_specs.column_types).
+Sheet = namedtuple("Sheet", "name rows columns types")
+
+
+def sheet(name, rows, columns=None, types=None):
+    return Sheet(name, rows, columns, types or {})
+
+
+# ===================== CELLS =====================
+_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_DATE = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+_EPOCH = datetime.datetime(1899, 12, 30)
+DATE_STYLE, HEADER_STYLE = 1, 2
+
+
+def _text(value, style=""):
+    value = _ILLEGAL.sub("", value)
+    space = ' xml:space="preserve"' if value[:1].isspace() or value[-1:].isspace() else ""
+    return f'<c t="inlineStr"{style}><is><t{space}>{escape(value)}</t></is></c>'
+
+
+def _serial(value):
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    delta = value - _EPOCH
+    return delta.days + delta.seconds / 86400
+
+
+def _cell(value, value_type="text"):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, str):
+        if value_type == "number" and _NUMBER.fullmatch(value):
+            return f"<c><v>{value}</v></c>"
+        if value_type == "date":
+            m = _DATE.fullmatch(value)
+            if m:
+                try:
+                    day = datetime.date(int(m.group(3)), int(m.group(2)), int(m.group(1)))
+                except ValueError:
+                    return _text(value)
+                return f'<c s="{DATE_STYLE}"><v>{_serial(day)}</v></c>'
+        return _text(value)
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Integral):
+        return f"<c><v>{int(value)}</v></c>"
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        # NaN (a missing duty type) is an empty cell, as with to_excel.
+        return "<c/>" if not math.isfinite(value) else f"<c><v>{value!r}</v></c>"
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return f'<c s="{DATE_STYLE}"><v>{_serial(value)}</v></c>'
+    return _text(str(value))
+
+
+# ===================== PACKAGE PARTS =====================
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_CT = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+
+_STYLES = (
+    f'{_XML}<styleSheet xmlns="{_MAIN}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _package_parts(names):
+    n = len(names)
+    sheets = range(1, n + 1)
+    yield "[Content_Types].xml", (
+        f'{_XML}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f'<Override PartName="/xl/workbook.xml" ContentType="{_CT}.sheet.main+xml"/>'
+        f'<Override PartName="/xl/styles.xml" ContentType="{_CT}.styles+xml"/>'
+        + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="{_CT}.worksheet+xml"/>'
+                  for i in sheets)
+        + '</Types>'
+    )
+    yield "_rels/.rels", (
+        f'{_XML}<Relationships xmlns="{_PKG_REL}">'
+        f'<Relationship Id="rId1" Type="{_REL}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    yield "xl/workbook.xml", (
+        f'{_XML}<workbook xmlns="{_MAIN}" xmlns:r="{_REL}"><sheets>'
+        + "".join(f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+                  for i, name in zip(sheets, names))
+        + '</sheets></workbook>'
+    )
+    yield "xl/_rels/workbook.xml.rels", (
+        f'{_XML}<Relationships xmlns="{_PKG_REL}">'
+        + "".join(f'<Relationship Id="rId{i}" Type="{_REL}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                  for i in sheets)
+        + f'<Relationship Id="rId{n + 1}" Type="{_REL}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    )
+    yield "xl/styles.xml", _STYLES
+
+
+class Sink:
+    # Write-only, unseekable file object: zipfile then streams each entry
+    # with a trailing data descriptor instead of seeking back to patch sizes.
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+def _columns(rows, columns):
+    if columns is not None:
+        return rows, list(columns)
+    if isinstance(rows, list):
+        return rows, list(dict.fromkeys(key for row in rows for key in row))
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return [], []
+    return chain([first], rows), list(first)
+
+
+# ===================== WRITER =====================
+def iter_xlsx(sheets, chunk_size=CHUNK_SIZE):
+    """Yield an .xlsx workbook as byte chunks while its rows are consumed.
+
+    Cells are written as inline strings and typed numbers/dates straight
+    into the deflate stream, so memory stays flat however many rows there
+    are; nothing is buffered beyond ~chunk_size bytes and ROWS_PER_WRITE rows.
+    """
+    sheets = list(sheets)
+    sink = Sink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as zf:
+        for name, data in _package_parts([s.name for s in sheets]):
+            zf.writestr(name, data)
+        for i, s in enumerate(sheets, 1):
+            rows, columns = _columns(s.rows, s.columns)
+            types = [s.types.get(column, "text") for column in columns]
+            with zf.open(f"xl/worksheets/sheet{i}.xml", "w") as part:
+                header = "".join(_text(str(column), f' s="{HEADER_STYLE}"') for column in columns)
+                part.write(f'{_XML}<worksheet xmlns="{_MAIN}"><sheetData><row r="1">{header}</row>'.encode())
+                buffer = []
+                for r, row in enumerate(rows, 2):
+                    cells = "".join(_cell(row.get(column), t) for column, t in zip(columns, types))
+                    buffer.append(f'<row r="{r}">{cells}</row>')
+                    if len(buffer) >= ROWS_PER_WRITE:
+                        part.write("".join(buffer).encode())
+                        buffer = []
+                        if sink.size >= chunk_size:
+                            yield sink.drain()
+                part.write(("".join(buffer) + "</sheetData></worksheet>").encode())
+            if sink.size >= chunk_size:
+                yield sink.drain()
+    yield sink.drain()